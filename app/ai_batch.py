@@ -0,0 +1,216 @@
+import asyncio
+import json
+import os
+import shutil
+import time
+import uuid
+from typing import Dict, List, Optional
+
+from openai.types import CompletionUsage
+
+from app.ai_processor import AIProcessor
+from app.llm_client import LLMClient
+from app.storage import cache_path
+
+ENDPOINT = '/v1/chat/completions'
+TERMINAL_STATUSES = {'completed', 'failed', 'expired', 'cancelled'}
+
+
+class OpenAIBatchBackend:
+    """OpenAI's Batch API: upload a JSONL file of requests, poll the batch, download the output file"""
+
+    def __init__(self, llm: LLMClient, completion_window: str = '24h'):
+        self.llm = llm
+        self.completion_window = completion_window
+
+    def upload(self, path: str) -> str:
+        async def upload(client):
+            with open(path, 'rb') as f:
+                return await client.files.create(file=f, purpose='batch')
+        return self.llm.call(upload).id
+
+    def create(self, input_file_id: str) -> str:
+        batch = self.llm.call(lambda client: client.batches.create(
+            input_file_id=input_file_id, endpoint=ENDPOINT, completion_window=self.completion_window
+        ))
+        return batch.id
+
+    def retrieve(self, batch_id: str) -> Dict:
+        batch = self.llm.call(lambda client: client.batches.retrieve(batch_id))
+        counts = batch.request_counts
+        return {
+            'status': batch.status,
+            'output_file_id': batch.output_file_id,
+            'error_file_id': batch.error_file_id,
+            'completed': counts.completed if counts else 0,
+            'failed': counts.failed if counts else 0,
+            'total': counts.total if counts else 0
+        }
+
+    def content(self, file_id: str) -> str:
+        return self.llm.call(lambda client: client.files.content(file_id)).text
+
+
+class LocalBatchBackend:
+    """Stand-in for the Batch API that speaks the same file protocol.
+
+    Input files are copied into `directory`, and each batch is executed in the
+    background through the shared `LLMClient` (so within its concurrency limit
+    and retry policy). Batch state and output files are kept next to the
+    inputs, in the same JSONL line format OpenAI returns.
+    """
+
+    def __init__(self, llm: LLMClient, directory: Optional[str] = None):
+        self.llm = llm
+        self.directory = directory or cache_path('batches')
+        os.makedirs(self.directory, exist_ok=True)
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    def _write_state(self, batch_id: str, state: Dict):
+        tmp_path = self._path(f"{batch_id}.json.tmp")
+        with open(tmp_path, 'w') as f:
+            json.dump(state, f)
+        os.replace(tmp_path, self._path(f"{batch_id}.json"))
+
+    def upload(self, path: str) -> str:
+        file_id = f"file-{uuid.uuid4().hex}"
+        shutil.copyfile(path, self._path(f"{file_id}.jsonl"))
+        return file_id
+
+    def create(self, input_file_id: str) -> str:
+        batch_id = f"batch-{uuid.uuid4().hex}"
+        self._write_state(batch_id, {'status': 'in_progress', 'input_file_id': input_file_id,
+                                     'output_file_id': None, 'error_file_id': None,
+                                     'completed': 0, 'failed': 0, 'total': 0})
+        self.llm.submit(self._execute(batch_id, input_file_id))
+        return batch_id
+
+    async def _execute(self, batch_id: str, input_file_id: str):
+        try:
+            await self._answer_all(batch_id, input_file_id)
+        except Exception as e:
+            print(f"❌ Local batch {batch_id} failed: {e}")
+            self._write_state(batch_id, {'status': 'failed', 'input_file_id': input_file_id,
+                                         'output_file_id': None, 'error_file_id': None,
+                                         'completed': 0, 'failed': 0, 'total': 0})
+
+    async def _answer_all(self, batch_id: str, input_file_id: str):
+        with open(self._path(f"{input_file_id}.jsonl"), 'r', encoding='utf-8') as f:
+            lines = [json.loads(line) for line in f if line.strip()]
+
+        async def answer(line: Dict) -> Dict:
+            try:
+                content = await self.llm.complete_async(line['body'])
+            except Exception as e:
+                return {'custom_id': line['custom_id'], 'response': None,
+                        'error': {'message': f"{type(e).__name__}: {e}"}}
+            body = {'choices': [{'index': 0, 'message': {'role': 'assistant', 'content': content}}]}
+            return {'custom_id': line['custom_id'], 'response': {'status_code': 200, 'body': body}, 'error': None}
+
+        outputs = await asyncio.gather(*(answer(line) for line in lines))
+        output_file_id = f"file-{uuid.uuid4().hex}"
+        with open(self._path(f"{output_file_id}.jsonl"), 'w', encoding='utf-8') as f:
+            for output in outputs:
+                f.write(json.dumps(output, ensure_ascii=False) + '\n')
+        failed = sum(1 for output in outputs if output['error'])
+        self._write_state(batch_id, {'status': 'completed', 'input_file_id': input_file_id,
+                                     'output_file_id': output_file_id, 'error_file_id': None,
+                                     'completed': len(outputs) - failed, 'failed': failed,
+                                     'total': len(outputs)})
+
+    def retrieve(self, batch_id: str) -> Dict:
+        with open(self._path(f"{batch_id}.json"), 'r') as f:
+            return json.load(f)
+
+    def content(self, file_id: str) -> str:
+        with open(self._path(f"{file_id}.jsonl"), 'r', encoding='utf-8') as f:
+            return f.read()
+
+
+class AIBatchRunner:
+    """Processes many candidates as one batch job instead of one request each.
+
+    Candidates already in the AI result cache are answered from it; the rest
+    are written to a JSONL request file, submitted to `backend` and polled
+    every `poll_interval` seconds until the batch finishes or `max_wait`
+    passes. Results go through the same parsing and caching as `process_idea`.
+    """
+
+    def __init__(self, processor: AIProcessor, backend, poll_interval: float = 30.0,
+                 max_wait: float = 24 * 3600):
+        self.processor = processor
+        self.backend = backend
+        self.poll_interval = poll_interval
+        self.max_wait = max_wait
+
+    def run(self, ideas: List[Dict]) -> List[Optional[Dict]]:
+        """Process `ideas`; the result list is aligned with the input, None where processing failed"""
+        results: List[Optional[Dict]] = [None] * len(ideas)
+        pending: Dict[str, int] = {}
+        lines = []
+        for position, idea in enumerate(ideas):
+            cache_key = self.processor.cache_key(idea)
+            cached = self.processor.cache.get(cache_key)
+            if cached is not None:
+                results[position] = self.processor.add_metadata(cached, idea)
+                continue
+            custom_id = f"idea-{position}"
+            pending[custom_id] = position
+            request = self.processor.build_request(idea)
+            lines.append({'custom_id': custom_id, 'method': 'POST', 'url': ENDPOINT, 'body': request})
+
+        print(f"📦 Batch: {len(ideas) - len(pending)} cached, {len(pending)} to submit")
+        if not pending:
+            return results
+
+        request_path = cache_path(f"batch-input-{int(time.time())}.jsonl")
+        with open(request_path, 'w', encoding='utf-8') as f:
+            for line in lines:
+                f.write(json.dumps(line, ensure_ascii=False) + '\n')
+        try:
+            batch_id = self.backend.create(self.backend.upload(request_path))
+        finally:
+            os.remove(request_path)
+        print(f"📦 Submitted batch {batch_id} with {len(lines)} requests")
+
+        state = self._wait(batch_id)
+        if state is None or not state.get('output_file_id'):
+            status = state['status'] if state else 'timed out'
+            print(f"❌ Batch {batch_id} ended without output ({status})")
+            return results
+
+        for line in self.backend.content(state['output_file_id']).splitlines():
+            if not line.strip():
+                continue
+            output = json.loads(line)
+            position = pending.get(output.get('custom_id'))
+            if position is None:
+                continue
+            response = output.get('response') or {}
+            if output.get('error') or response.get('status_code') != 200:
+                print(f"⚠️ Batch request {output.get('custom_id')} failed: {output.get('error')}")
+                continue
+            idea = ideas[position]
+            if response['body'].get('usage'):
+                self.processor.llm.usage.record(response['body'].get('model'),
+                                                CompletionUsage(**response['body']['usage']), 0.0,
+                                                {'batch_id': batch_id})
+            content = response['body']['choices'][0]['message']['content']
+            result = self.processor.parse_response(content, self.processor.cache_key(idea))
+            results[position] = self.processor.add_metadata(result, idea)
+
+        print(f"📦 Batch {batch_id}: {state['completed']} completed, {state['failed']} failed")
+        return results
+
+    def _wait(self, batch_id: str) -> Optional[Dict]:
+        deadline = time.monotonic() + self.max_wait
+        while True:
+            state = self.backend.retrieve(batch_id)
+            if state['status'] in TERMINAL_STATUSES:
+                return state
+            if time.monotonic() >= deadline:
+                print(f"⏱️ Batch {batch_id} still {state['status']} after {self.max_wait:.0f}s")
+                return None
+            time.sleep(self.poll_interval)
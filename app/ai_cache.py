@@ -0,0 +1,81 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional
+
+from app.storage import cache_path
+
+
+class AIResultCache:
+    """Persistent cache of AI results keyed by a hash of everything that shapes them.
+
+    The key covers the prompt template version, the model and the candidate's
+    title, content and category, so a changed prompt or model never serves an
+    old answer. Entries older than `ttl` are ignored and dropped; beyond
+    `max_entries` the least recently used ones are evicted.
+    """
+
+    def __init__(self, path: Optional[str] = None, ttl: float = 30 * 24 * 3600, max_entries: int = 2000):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.stats = {'hits': 0, 'misses': 0, 'stored': 0}
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path or cache_path('ai_results.sqlite3'), check_same_thread=False)
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS results (
+                key TEXT PRIMARY KEY,
+                result TEXT NOT NULL,
+                stored_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )
+        """)
+        self._db.commit()
+
+    @staticmethod
+    def key(prompt_version: int, model: str, title: str, content: str, category: str) -> str:
+        payload = json.dumps([prompt_version, model, title, content, category], ensure_ascii=False)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict]:
+        now = time.time()
+        with self._lock:
+            row = self._db.execute(
+                "SELECT result FROM results WHERE key = ? AND stored_at >= ?", (key, now - self.ttl)
+            ).fetchone()
+            if row is None:
+                self.stats['misses'] += 1
+                return None
+            self._db.execute("UPDATE results SET last_access = ? WHERE key = ?", (now, key))
+            self._db.commit()
+            self.stats['hits'] += 1
+        return json.loads(row[0])
+
+    def peek(self, key: str) -> bool:
+        """Whether a fresh result is cached, without counting a hit or touching its recency"""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT 1 FROM results WHERE key = ? AND stored_at >= ?", (key, time.time() - self.ttl)
+            ).fetchone()
+        return row is not None
+
+    def put(self, key: str, result: Dict):
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?)",
+                (key, json.dumps(result, ensure_ascii=False), now, now)
+            )
+            self._db.execute("DELETE FROM results WHERE stored_at < ?", (now - self.ttl,))
+            self._db.execute(
+                "DELETE FROM results WHERE key NOT IN "
+                "(SELECT key FROM results ORDER BY last_access DESC LIMIT ?)",
+                (self.max_entries,)
+            )
+            self._db.commit()
+            self.stats['stored'] += 1
+
+    def print_stats(self):
+        print(f"🧠 AI result cache: {self.stats['hits']} hits, {self.stats['misses']} misses, "
+              f"{self.stats['stored']} stored")
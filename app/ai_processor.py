@@ -1,59 +1,28 @@
+import asyncio
 import openai
 import os
-from typing import Dict, Optional
+from typing import AsyncIterator, Dict, List, Optional, Tuple
 from datetime import datetime
-import json
+from app.ai_cache import AIResultCache
+from app.json_stream import JSONFieldStream, MalformedStream
+from app.llm_client import LLMClient
 from app.models import Idea
+from app.prompt_budget import CompactedContent, compact_content, count_tokens, estimate_cost, normalize_content
+from app.structured_output import FAILED, parse_idea, response_format_for, validate_idea
 
-class AIProcessor:
-    def __init__(self):
-        self.api_key = os.getenv("OPENAI_API_KEY")
-        if self.api_key:
-            openai.api_key = self.api_key
-        else:
-            raise ValueError("OPENAI_API_KEY environment variable is required")
-
-    def process_idea(self, idea_data: Dict) -> Optional[Dict]:
-        """Process an idea with AI to create Korean summary and context"""
-        try:
-            prompt = self._create_prompt(idea_data)
-            result = self._get_ai_response(prompt)
-            
-            if result:
-                # Add metadata
-                result['source_url'] = idea_data.get('url', '')
-                result['published_at'] = datetime.now()
-                result['language'] = 'ko'
-                result['source_type'] = idea_data.get('source_type', 'ideabrowser')
-                result['archived'] = False
-                
-                return result
-        except Exception as e:
-            print(f"Error processing idea: {e}")
-        return None
+# Bump whenever _create_prompt or the system message changes, so cached results are not reused
+PROMPT_VERSION = 2
 
-    def _create_prompt(self, idea_data: Dict) -> str:
-        """Create the prompt for AI processing"""
-        title = idea_data.get('title', '')
-        content = idea_data.get('content', '')
-        source_type = idea_data.get('source_type', '')
-        category = idea_data.get('category', '')
+# Instructions shared by every call. They come before anything candidate-specific,
+# so the provider can cache this prefix across calls.
+SYSTEM_MESSAGE = "You are a startup idea analyst and translator for Korean entrepreneurs. Always respond in valid JSON format. Create compelling, actionable business ideas that make readers want to start a business. Focus on practical implementation and market opportunities."
 
-        prompt = f"""
-당신은 한국의 창업자들을 위해 운영되는 아이디어 발굴 플랫폼 "IdeaOasis"의 전담 에이전트입니다.
+PROMPT_INSTRUCTIONS = """당신은 한국의 창업자들을 위해 운영되는 아이디어 발굴 플랫폼 "IdeaOasis"의 전담 에이전트입니다.
 ideabrowser.com의 프레임워크를 참고하여 해외 아이디어를 한국어로 요약, 번역, 맥락화해주세요.
 
-다음 해외 아이디어를 처리해주세요:
-
-제목: {title}
-내용: {content}
-출처: {source_type}
-카테고리: {category}
-
-다음 포맷으로 JSON 형태로 응답해주세요:
-{{
+맨 아래에 주어지는 해외 아이디어를 처리하여 다음 포맷으로 JSON 형태로 응답해주세요:
+{
   "idea_title": "[매력적이고 실행 가능한 한국어 아이디어 제목]",
-  "source_url": "{idea_data.get('url', '')}",
   "summary_kr": "🚀 오늘의 창업 아이디어
 
 💡 아이디어 핵심
@@ -82,7 +51,7 @@ ideabrowser.com의 프레임워크를 참고하여 해외 아이디어를 한국
 💪 창업자에게 주는 메시지
 • [이 아이디어로 창업할 때의 장점과 주의사항]
 • [성공을 위한 핵심 팁]"
-}}
+}
 
 요구사항:
 1. ideabrowser.com의 전문적이고 구조화된 프레임워크를 따라 작성
@@ -94,35 +63,294 @@ ideabrowser.com의 프레임워크를 참고하여 해외 아이디어를 한국
 7. GPT 수준의 고품질 한국어 사용
 8. 뉴스 기사가 아닌 실행 가능한 비즈니스 아이디어로 구성
 """
-        return prompt
 
-    def _get_ai_response(self, prompt: str) -> Optional[Dict]:
-        """Get response from OpenAI API using the new v1.0+ format"""
+class AIProcessor:
+    def __init__(self, cache: Optional[AIResultCache] = None):
+        self.api_key = os.getenv("OPENAI_API_KEY")
+        if self.api_key:
+            openai.api_key = self.api_key
+        else:
+            raise ValueError("OPENAI_API_KEY environment variable is required")
+        self.model = os.getenv("OPENAI_MODEL", "gpt-4")
+        # Constrain output to the idea schema where the model supports it
+        self.response_format = response_format_for(self.model, os.getenv("OPENAI_RESPONSE_FORMAT", "auto"))
+        self.parse_stats = {'ok': 0, 'repaired': 0, 'failed': 0}
+        # Scraped content beyond this many tokens is cut before it reaches the prompt
+        self.content_budget = int(os.getenv("PROMPT_CONTENT_TOKENS", "1200"))
+        # One long-lived client (and connection pool) for every call this processor makes
+        self.llm = LLMClient(
+            self.api_key,
+            max_concurrency=int(os.getenv("OPENAI_MAX_CONCURRENCY", "4")),
+            timeout=float(os.getenv("OPENAI_TIMEOUT", "60")),
+            # e.g. a local `app.openai_stub` server for offline load tests
+            base_url=os.getenv("OPENAI_BASE_URL") or None
+        )
+        # Candidates processed before are answered from disk at no API cost
+        self.cache = cache or AIResultCache()
+        # Record/replay bundle (see `app.replay.FixtureBundle`), attached by the runner
+        self.fixtures = None
+
+    def process_idea(self, idea_data: Dict) -> Optional[Dict]:
+        """Process an idea with AI to create Korean summary and context"""
+        return self.llm.run(self.process_idea_async(idea_data))
+
+    def process_ideas(self, ideas: List[Dict]) -> List[Optional[Dict]]:
+        """Process several ideas at once, bounded by the client's concurrency limit"""
+        return self.llm.run(self.process_ideas_async(ideas))
+
+    async def process_ideas_async(self, ideas: List[Dict]) -> List[Optional[Dict]]:
+        return list(await asyncio.gather(*(self.process_idea_async(idea) for idea in ideas)))
+
+    async def process_idea_async(self, idea_data: Dict) -> Optional[Dict]:
         try:
-            client = openai.OpenAI(api_key=self.api_key)
-
-            response = client.chat.completions.create(
-                model="gpt-4",
-                messages=[
-                    {"role": "system", "content": "You are a startup idea analyst and translator for Korean entrepreneurs. Always respond in valid JSON format. Create compelling, actionable business ideas that make readers want to start a business. Focus on practical implementation and market opportunities."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.7,
-                max_tokens=3000
-            )
-            content = response.choices[0].message.content
-            return json.loads(content)
-        except json.JSONDecodeError as e:
-            print(f"JSON decoding error: {e}")
-            print(f"Raw AI response: {content}")
+            cache_key = self.cache_key(idea_data)
+            result = self.cache.get(cache_key)
+            if result is not None:
+                print(f"🧠 Reusing cached AI result for: {idea_data.get('title', '')[:50]}...")
+            else:
+                request, meta = self._prepare(idea_data)
+                result = await self._get_ai_response(request, cache_key, meta)
+            
+            if result:
+                return self.add_metadata(result, idea_data)
+        except Exception as e:
+            print(f"Error processing idea: {e}")
+        return None
+
+    def process_first_valid(self, ideas: List[Dict], cost_cap: float,
+                            hedge_delay: Optional[float] = None) -> Optional[Dict]:
+        """Process candidates in priority order with staggered backups and return the first valid result"""
+        return self.llm.run(self.process_first_valid_async(ideas, cost_cap, hedge_delay))
+
+    async def process_first_valid_async(self, ideas: List[Dict], cost_cap: float,
+                                        hedge_delay: Optional[float] = None) -> Optional[Dict]:
+        """Process the candidates (best first) within `cost_cap` USD of worst-case
+        spend and accept the first valid result in priority order.
+
+        Only the top candidate starts right away. The next backup starts when a
+        higher-ranked candidate fails or, with `hedge_delay`, whenever the one
+        being waited for is still running that many seconds later, so backups
+        only cost money when they are needed. A lower-ranked candidate only
+        wins if every candidate above it failed; calls still running are then
+        cancelled. If no result is valid, the highest-ranked fallback result is
+        returned, as a single call would have.
+        """
+        admitted = []
+        spent = 0.0
+        for idea in ideas:
+            cost = self.estimate_cost(idea)
+            if admitted and spent + cost > cost_cap:
+                break
+            spent += cost
+            admitted.append(idea)
+
+        tasks = []
+
+        def start_next():
+            if len(tasks) > 0:
+                print(f"🏁 Starting backup candidate #{len(tasks) + 1} of {len(admitted)}")
+            tasks.append(asyncio.ensure_future(self.process_idea_async(admitted[len(tasks)])))
+
+        fallback = None
+        try:
+            for position in range(len(admitted)):
+                if position == len(tasks):
+                    start_next()
+                task = tasks[position]
+                while hedge_delay and len(tasks) < len(admitted):
+                    done, _ = await asyncio.wait({task}, timeout=hedge_delay)
+                    if done:
+                        break
+                    start_next()
+                result = await task
+                if result and not result.get('fallback'):
+                    if position:
+                        print(f"🏁 Candidate #{position + 1} accepted after higher-ranked ones failed")
+                    return result
+                fallback = fallback or result
+        finally:
+            for task in tasks:
+                task.cancel()
+        return fallback
+
+    def estimate_cost(self, idea_data: Dict) -> float:
+        """Worst-case USD cost of processing an idea; nothing if its result is cached"""
+        if self.cache.peek(self.cache_key(idea_data)):
+            return 0.0
+        request = self.build_request(idea_data)
+        prompt_tokens = sum(count_tokens(message['content'], self.model) for message in request['messages'])
+        return estimate_cost(self.model, prompt_tokens, request['max_tokens'])
+
+    async def stream_idea(self, idea_data: Dict) -> AsyncIterator[Dict]:
+        """Process an idea while streaming the completion, yielding events as fields arrive.
+
+        Events are `{'event': 'delta', 'field', 'text'}` for each decoded piece
+        of a string field (e.g. `summary_kr` progress), `{'event': 'field',
+        'field', 'value'}` once a field is complete (`idea_title` comes first),
+        then one `{'event': 'result', 'idea'}` or `{'event': 'error', 'message'}`.
+        Output that stops looking like the expected JSON object ends the
+        stream, and the generation, immediately.
+        """
+        cache_key = self.cache_key(idea_data)
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            print(f"🧠 Reusing cached AI result for: {idea_data.get('title', '')[:50]}...")
+            for field, value in cached.items():
+                yield {'event': 'field', 'field': field, 'value': value}
+            yield {'event': 'result', 'idea': self.add_metadata(cached, idea_data)}
+            return
+
+        request, meta = self._prepare(idea_data)
+        parser = JSONFieldStream()
+        stream = self._stream(request, meta)
+        try:
+            async for text in stream:
+                for kind, field, value in parser.feed(text):
+                    if kind == 'delta':
+                        yield {'event': 'delta', 'field': field, 'text': value}
+                    else:
+                        yield {'event': 'field', 'field': field, 'value': value}
+            if not parser.done:
+                raise MalformedStream("stream ended before the JSON object was complete")
+        except MalformedStream as e:
+            self.parse_stats[FAILED] += 1
+            print(f"Error streaming AI response: {e}")
+            yield {'event': 'error', 'message': f"{type(e).__name__}: {e}"}
+            return
+        except Exception as e:
+            print(f"Error streaming AI response: {e}")
+            yield {'event': 'error', 'message': f"{type(e).__name__}: {e}"}
+            return
+        finally:
+            # Cancels the request if the stream was abandoned early
+            await stream.aclose()
+
+        result = validate_idea(parser.fields)
+        if result is None:
+            self.parse_stats[FAILED] += 1
+            yield {'event': 'error', 'message': "AI response is missing required fields"}
+            return
+        self.parse_stats['ok'] += 1
+        self.cache.put(cache_key, result)
+        yield {'event': 'result', 'idea': self.add_metadata(result, idea_data)}
+
+    def cache_key(self, idea_data: Dict) -> str:
+        # Keyed on the normalized content, so whitespace or boilerplate differences
+        # between crawls do not cause a new call; not on the token-budgeted cut,
+        # which moves with whether tiktoken or the estimate counted it
+        content = normalize_content(idea_data.get('content', ''))
+        return AIResultCache.key(
+            PROMPT_VERSION, self.model, idea_data.get('title', ''),
+            content, idea_data.get('category', '')
+        )
+
+    def add_metadata(self, result: Dict, idea_data: Dict) -> Dict:
+        result['source_url'] = idea_data.get('url', '')
+        result['published_at'] = datetime.now()
+        result['language'] = 'ko'
+        result['source_type'] = idea_data.get('source_type', 'ideabrowser')
+        result['archived'] = False
+        return result
+
+    def _create_prompt(self, idea_data: Dict) -> Tuple[str, CompactedContent]:
+        """Create the prompt for AI processing: the static instructions, then the compacted candidate"""
+        compacted = compact_content(idea_data.get('content', ''), self.content_budget, self.model)
+        prompt = f"""{PROMPT_INSTRUCTIONS}
+다음 해외 아이디어를 처리해주세요:
+
+제목: {' '.join(idea_data.get('title', '').split())}
+내용: {compacted.text}
+출처: {idea_data.get('source_type', '')}
+카테고리: {idea_data.get('category', '')}
+"""
+        return prompt, compacted
+
+    def build_request(self, idea_data: Dict) -> Dict:
+        """Chat-completion request body for one idea"""
+        return self._prepare(idea_data)[0]
+
+    def _prepare(self, idea_data: Dict) -> Tuple[Dict, Dict]:
+        """Request body for one idea, plus the compaction figures logged with its token usage"""
+        prompt, compacted = self._create_prompt(idea_data)
+        request = dict(
+            model=self.model,
+            messages=[
+                {"role": "system", "content": SYSTEM_MESSAGE},
+                {"role": "user", "content": prompt}
+            ],
+            temperature=0.7,
+            max_tokens=3000
+        )
+        if self.response_format:
+            request['response_format'] = self.response_format
+        meta = {'content_tokens_raw': compacted.raw_tokens, 'content_tokens': compacted.tokens}
+        return request, meta
+
+    def parse_response(self, content: str, cache_key: Optional[str] = None) -> Dict:
+        """Decode and validate a completion (repairing near-valid JSON locally), caching good answers"""
+        result, outcome = parse_idea(content)
+        self.parse_stats[outcome] += 1
+        if outcome == FAILED:
+            print(f"JSON decoding error, raw AI response: {content[:500]}")
             return self._fallback_response(content)
+        # Only well-formed answers are cached; fallbacks are retried next time
+        if cache_key:
+            self.cache.put(cache_key, result)
+        return result
+
+    def complete(self, request: Dict, meta: Optional[Dict] = None) -> str:
+        """Blocking chat completion for other stages (e.g. triage), recorded and replayed like the rest"""
+        return self.llm.run(self._complete(request, meta))
+
+    async def _get_ai_response(self, request: Dict, cache_key: Optional[str] = None,
+                               meta: Optional[Dict] = None) -> Optional[Dict]:
+        """Get response from OpenAI API using the new v1.0+ format"""
+        try:
+            content = await self._complete(request, meta)
+            return self.parse_response(content, cache_key)
         except Exception as e:
             print(f"Error getting AI response: {e}")
             return None
 
+    async def _complete(self, request: Dict, meta: Optional[Dict] = None) -> str:
+        """Run one chat completion, answering from the fixture bundle when replaying"""
+        if self.fixtures and self.fixtures.replaying:
+            return self.fixtures.replay_llm(request)
+
+        content = await self.llm.complete_async(request, meta)
+        if self.fixtures:
+            self.fixtures.record_llm(request, content)
+        return content
+
+    async def _stream(self, request: Dict, meta: Optional[Dict] = None) -> AsyncIterator[str]:
+        """Stream one chat completion; fixture runs deliver the whole completion as one delta"""
+        if self.fixtures and self.fixtures.replaying:
+            yield self.fixtures.replay_llm(request)
+            return
+
+        chunks = []
+        async for text in self.llm.stream_async(request, meta):
+            chunks.append(text)
+            yield text
+        if self.fixtures:
+            self.fixtures.record_llm(request, ''.join(chunks))
+
+    def close(self):
+        """Release the OpenAI client's connections and background loop"""
+        self.llm.close()
+
+    def print_stats(self):
+        self.cache.print_stats()
+        self.llm.print_stats()
+        parsed = sum(self.parse_stats.values())
+        failure_rate = self.parse_stats['failed'] / parsed if parsed else 0.0
+        print(f"🧩 AI JSON: {self.parse_stats['ok']} valid, {self.parse_stats['repaired']} repaired, "
+              f"{self.parse_stats['failed']} failed ({failure_rate:.0%} failure rate)")
+
     def _fallback_response(self, content: str) -> Dict:
         """Create a fallback response if JSON parsing fails"""
         return {
+            'fallback': True,
             'idea_title': '혁신적인 해외 스타트업 아이디어',
             'summary_kr': f"""
 🚀 오늘의 창업 아이디어
@@ -1,22 +1,58 @@
+import os
 import random
+import tempfile
 import time
-from typing import List, Dict, Optional
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Iterator, List, Dict, Optional, Tuple
 from datetime import datetime, timedelta
+from urllib.parse import urlparse
 from sqlalchemy.orm import Session
 
-from app.scrapers.ideabrowser_scraper import IdeaBrowserScraper
+from app.scrapers.ideabrowser_scraper import IdeaBrowserParser, IdeaBrowserScraper
 from app.scrapers.hackernews_scraper import HackerNewsScraper
-from app.scrapers.producthunt_scraper import ProductHuntScraper
+from app.scrapers.producthunt_scraper import ProductHuntParser, ProductHuntScraper
+from app.scrapers.circuit_breaker import CircuitBreakerStore
+from app.scrapers.fetcher import AsyncFetcher
+from app.scrapers.http_session import PooledSession
+from app.scrapers.http_cache import ResponseCache
+from app.scrapers.frontier import SeenFrontier
+from app.scrapers.page_archive import PageArchive
+from app.scrapers.parse_pool import ParsePool
+from app.scrapers.selector_plans import SelectorPlanStore
 from app.ai_processor import AIProcessor
+from app.triage import OFF as TRIAGE_OFF, IdeaTriage
+from app.replay import FixtureBundle
 from app.models import Idea, get_db
 
 class IdeaDiscoveryAgent:
-    def __init__(self):
-        self.ideabrowser_scraper = IdeaBrowserScraper()
-        self.hn_scraper = HackerNewsScraper()
-        self.ph_scraper = ProductHuntScraper()
+    def __init__(self, fixtures: Optional[FixtureBundle] = None, seed: Optional[int] = None):
+        # One keep-alive session, response cache and fetch layer shared by every
+        # scraper (per-host connection pools and caps, retries, global deadline)
+        self.http_session = PooledSession()
+        self.http_cache = ResponseCache()
+        # Hosts that keep failing are skipped until a half-open probe succeeds
+        self.circuit_breakers = CircuitBreakerStore()
+        # Raw pages are kept so extractor and scoring changes can be replayed offline
+        self.page_archive = PageArchive()
+        self.fetcher = AsyncFetcher(session=self.http_session, cache=self.http_cache,
+                                    breakers=self.circuit_breakers, archive=self.page_archive)
+        # Items reported on earlier days are skipped, so work scales with what is new
+        self.frontier = SeenFrontier()
+        # Large listing pages are parsed on every core while fetching continues
+        self.parse_pool = ParsePool()
+        self.ideabrowser_scraper = IdeaBrowserScraper(fetcher=self.fetcher, frontier=self.frontier,
+                                                      parse_pool=self.parse_pool)
+        self.hn_scraper = HackerNewsScraper(fetcher=self.fetcher, frontier=self.frontier)
+        self.ph_scraper = ProductHuntScraper(fetcher=self.fetcher, frontier=self.frontier,
+                                             parse_pool=self.parse_pool)
         self.ai_processor = AIProcessor()
         
+        # Recorded runs replay the same category sample from the same seed
+        self.random = random.Random(seed)
+        self.fetcher.fixtures = fixtures
+        self.ai_processor.fixtures = fixtures
+        
         # Define idea categories similar to ideabrowser.com
         self.categories = [
             'saas', 'mobile-app', 'web-app', 'ecommerce', 'fintech',
@@ -25,118 +61,284 @@ class IdeaDiscoveryAgent:
             'marketplace', 'subscription', 'freemium', 'b2b', 'b2c'
         ]
         
+        # Detail pages are only fetched for the best few candidates
+        self.enrich_top_n = 5
+        self.enrich_workers = 4
+        
+        # A cheap model rates the top candidates before the expensive translation
+        self.triage = IdeaTriage(
+            self.ai_processor,
+            model=os.getenv("TRIAGE_MODEL", "gpt-4o-mini"),
+            top_n=int(os.getenv("TRIAGE_TOP_N", "5")),
+            mode=os.getenv("TRIAGE_MODE", "llm")
+        )
+        
+        # Backup candidates for the selected one, within a worst-case spend cap; a
+        # backup only starts once a higher-ranked one failed or, with a hedge
+        # delay, is still running after it
+        self.speculative_top_k = int(os.getenv("SPECULATIVE_TOP_K", "3"))
+        self.ai_cost_cap = float(os.getenv("AI_COST_CAP_USD", "0.75"))
+        self.speculative_hedge_delay = float(os.getenv("SPECULATIVE_HEDGE_SECONDS", "0")) or None
+        
+        # An IdeaBrowser candidate scoring at least this much ends collection early,
+        # once there are enough IdeaBrowser candidates for triage and the backups.
+        # Listing cards score 4 (source) + 1 (recency), +1.5 with a known category,
+        # +1 for a quality keyword, -2 under 50 characters and +1.5 over 200, so
+        # 5.0-7.5 is typical; 6.5 is a categorized card or a long, specific one
+        self.good_enough_score = float(os.getenv("GOOD_ENOUGH_SCORE", "6.5"))
+        
     def discover_daily_idea(self) -> Optional[Dict]:
         """Main method to discover and process one daily idea"""
         print("🔍 Starting daily idea discovery...")
         
-        # Step 1: Collect ideas from multiple sources
-        all_ideas = self._collect_ideas_from_sources()
+        # One fetch run per discovery, so each page is fetched and parsed at most once
+        with self.fetcher.run():
+            return self._discover_daily_idea()
+    
+    def select_daily_idea(self) -> Optional[Dict]:
+        """Collect, enrich and select today's candidate without processing it with AI"""
+        print("🔍 Starting daily idea selection...")
         
-        if not all_ideas:
-            print("❌ No ideas collected from sources")
+        with self.fetcher.run():
+            return self._select_daily_idea()
+    
+    def _discover_daily_idea(self) -> Optional[Dict]:
+        candidates = self._rank_daily_candidates()
+        if not candidates:
             return None
         
-        # Step 2: Filter and rank ideas
-        filtered_ideas = self._filter_and_rank_ideas(all_ideas)
+        # Step 4: Process with AI; the next-best candidates are backups, so a
+        # failed call does not cost the day its idea
+        processed_idea = self.ai_processor.process_first_valid(candidates[:self.speculative_top_k],
+                                                               self.ai_cost_cap, self.speculative_hedge_delay)
+        self.ai_processor.print_stats()
         
-        if not filtered_ideas:
-            print("❌ No ideas passed filtering")
+        if processed_idea:
+            print(f"✅ Successfully processed idea: {processed_idea['idea_title']}")
+            # Only now are today's candidates remembered as seen
+            self.frontier.commit()
+            return processed_idea
+        else:
+            print("❌ Failed to process idea with AI")
             return None
+    
+    def _select_daily_idea(self) -> Optional[Dict]:
+        candidates = self._rank_daily_candidates()
+        return candidates[0] if candidates else None
+    
+    def _rank_daily_candidates(self) -> List[Dict]:
+        """Steps 1-3 of discovery: the candidates in the order they should be published, best first"""
+        started = time.monotonic()
         
-        # Step 3: Check for duplicates in database
-        unique_ideas = self._check_duplicates(filtered_ideas)
+        # Step 1: Stream candidates from all sources, scoring and checking
+        # duplicates as they arrive; stops early on a good-enough candidate
+        unique_ideas = self._collect_candidates()
         
         if not unique_ideas:
-            print("❌ All ideas are duplicates")
-            return None
+            print("❌ No new, unique ideas collected from sources")
+            return []
+        
+        # Step 2: Enrich the top candidates with their detail pages and re-rank
+        unique_ideas = self._enrich_top_candidates(unique_ideas)
         
-        # Step 4: Select the best idea
+        # Step 3: Let the triage stage rate the leading candidates, then select the best idea
+        unique_ideas = self._triage_candidates(unique_ideas)
         best_idea = self._select_best_idea(unique_ideas)
         
         if not best_idea:
             print("❌ Could not select best idea")
-            return None
-        
-        # Step 5: Process with AI
-        processed_idea = self.ai_processor.process_idea(best_idea)
-        
-        if processed_idea:
-            print(f"✅ Successfully processed idea: {processed_idea['idea_title']}")
-            return processed_idea
-        else:
-            print("❌ Failed to process idea with AI")
-            return None
+            return []
+        print(f"⏱️ Idea selected after {time.monotonic() - started:.1f}s")
+        # Triage put the candidates `_select_best_idea` prefers first, so the selected one leads
+        return unique_ideas
     
-    def _collect_ideas_from_sources(self) -> List[Dict]:
-        """Collect ideas from all available sources mimicking ideabrowser.com approach"""
-        all_ideas = []
-        
-        # Collect from IdeaBrowser (primary source) - mimicking their framework
-        try:
-            print("🌐 Collecting from IdeaBrowser.com...")
-            
-            # Try different approaches like ideabrowser.com
-            ideabrowser_ideas = []
-            
-            # Get general ideas
-            general_ideas = self.ideabrowser_scraper.get_startup_ideas()
-            ideabrowser_ideas.extend(general_ideas)
-            
-            # Get trending ideas
-            trending_ideas = self.ideabrowser_scraper.get_trending_ideas()
-            ideabrowser_ideas.extend(trending_ideas)
-            
-            # Get ideas by category (like ideabrowser.com categorization)
-            for category in random.sample(self.categories, 3):  # Try 3 random categories
-                category_ideas = self.ideabrowser_scraper.get_ideas_by_category(category)
-                ideabrowser_ideas.extend(category_ideas)
-            
-            all_ideas.extend(ideabrowser_ideas)
-            print(f"✅ Collected {len(ideabrowser_ideas)} ideas from IdeaBrowser")
-            
-        except Exception as e:
-            print(f"❌ Error collecting from IdeaBrowser: {e}")
-        
-        # Collect from Hacker News
-        try:
-            print("📰 Collecting from Hacker News...")
-            hn_ideas = self.hn_scraper.get_startup_ideas()
-            all_ideas.extend(hn_ideas)
-            print(f"✅ Collected {len(hn_ideas)} ideas from Hacker News")
-            
-            # Also get Show HN posts
-            show_hn_ideas = self.hn_scraper.get_show_hn_posts()
-            all_ideas.extend(show_hn_ideas)
-            print(f"✅ Collected {len(show_hn_ideas)} Show HN ideas")
-        except Exception as e:
-            print(f"❌ Error collecting from Hacker News: {e}")
+    def discover_batch(self, top_k: int, runner) -> List[Dict]:
+        """Discover and process the top-k candidates of one crawl as a single batch job; only valid results are returned"""
+        print(f"🔍 Starting batch discovery of up to {top_k} ideas...")
+        
+        with self.fetcher.run():
+            unique_ideas = self._collect_candidates()
+            if not unique_ideas:
+                print("❌ No new, unique ideas collected from sources")
+                return []
+            unique_ideas = self._enrich_top_candidates(unique_ideas, top_n=max(top_k, self.enrich_top_n))
+        
+        results = [result for result in runner.run(unique_ideas[:top_k]) if result]
+        # Unparseable answers come back as the generic template idea, which is never published
+        dropped = sum(1 for result in results if result.get('fallback'))
+        results = [result for result in results if not result.get('fallback')]
+        print(f"✅ Processed {len(results)} of {min(top_k, len(unique_ideas))} candidates in batch"
+              + (f", dropped {dropped} unparseable answers" if dropped else ""))
+        if results:
+            self.frontier.commit()
+        return results
+    
+    def _stream_ideas_from_sources(self) -> Iterator[Tuple[str, Dict]]:
+        """Yield `(source, idea)` from all sources as each page is parsed"""
+        # Every source runs at the same time through the shared fetcher, so
+        # candidates arrive from whichever source answers first
+        
+        # IdeaBrowser (primary source) - general, trending and 3 random categories
+        jobs = {
+            'ideabrowser_general': self.ideabrowser_scraper.iter_startup_ideas,
+            'ideabrowser_trending': self.ideabrowser_scraper.iter_trending_ideas,
+        }
+        for category in self.random.sample(self.categories, 3):  # Try 3 random categories
+            jobs[f'ideabrowser_category_{category}'] = (
+                lambda category=category: self.ideabrowser_scraper.iter_ideas_by_category(category)
+            )
         
-        # Collect from Product Hunt
-        try:
-            print("🚀 Collecting from Product Hunt...")
-            ph_ideas = self.ph_scraper.get_today_products()
-            all_ideas.extend(ph_ideas)
-            print(f"✅ Collected {len(ph_ideas)} ideas from Product Hunt")
-        except Exception as e:
-            print(f"❌ Error collecting from Product Hunt: {e}")
+        # Hacker News stories plus Show HN posts, and Product Hunt
+        jobs['hackernews'] = self.hn_scraper.iter_startup_ideas
+        jobs['hackernews_showhn'] = self.hn_scraper.iter_show_hn_posts
+        jobs['producthunt'] = self.ph_scraper.iter_today_products
         
-        return all_ideas
+        print("🌐 Collecting from IdeaBrowser.com, Hacker News and Product Hunt...")
+        # Recorded and replayed runs take items in job order rather than arrival
+        # order, so early stopping and tie-breaking pick the same candidates
+        with self.fetcher.run():
+            yield from self.fetcher.stream_jobs(jobs, ordered=self.fetcher.fixtures is not None)
     
-    def _filter_and_rank_ideas(self, ideas: List[Dict]) -> List[Dict]:
-        """Filter and rank ideas based on quality criteria (mimicking ideabrowser.com approach)"""
-        filtered_ideas = []
+    def _collect_candidates(self) -> List[Dict]:
+        """Score and de-duplicate ideas as they stream in, ranked best first.
+        
+        Collection stops, and the remaining fetches are cancelled, once an
+        IdeaBrowser candidate (which `_select_best_idea` prefers anyway) scores
+        at least `good_enough_score` and there are enough IdeaBrowser candidates
+        for triage to compare and for the speculative backups. Only the items
+        received before that are staged as seen in the frontier; the rest stay
+        new for the next run.
+        """
+        started = time.monotonic()
+        counts = Counter()
+        seen_items = set()
+        candidates = []
+        triage_n = self.triage.top_n if self.triage.mode != TRIAGE_OFF else 1
+        wanted_ideabrowser = max(triage_n, self.speculative_top_k, 1)
+        ideabrowser_count = 0
+        good_enough = None
         
-        for idea in ideas:
-            score = self._calculate_idea_score(idea)
-            if score > 0:  # Only include ideas with positive scores
+        db = next(get_db())
+        stream = self._stream_ideas_from_sources()
+        try:
+            for source, idea in stream:
+                counts[source] += 1
+                item_key = idea.pop('item_key', None)
+                if item_key:
+                    self.frontier.mark(item_key)
+                
+                score = self._calculate_idea_score(idea)
+                if score <= 0:
+                    continue
                 idea['quality_score'] = score
-                filtered_ideas.append(idea)
+                
+                # The same story can show up on several listings within one run;
+                # items without their own link all share the site's URL
+                url = idea.get('url', '')
+                seen_key = url if item_key else (url, idea.get('title', ''))
+                if seen_key in seen_items:
+                    continue
+                seen_items.add(seen_key)
+                
+                temp_title = idea.get('title', '')[:100]
+                if self.ai_processor.check_duplicate(temp_title, db):
+                    print(f"⚠️ Skipping duplicate: {temp_title[:50]}...")
+                    continue
+                candidates.append(idea)
+                
+                if 'ideabrowser' not in idea.get('source_type', ''):
+                    continue
+                ideabrowser_count += 1
+                if score >= self.good_enough_score and good_enough is None:
+                    good_enough = idea
+                if good_enough is not None and ideabrowser_count >= wanted_ideabrowser:
+                    print(f"⚡ Good-enough candidate ({good_enough['quality_score']:.1f}): "
+                          f"{good_enough.get('title', '')[:50]}... with {ideabrowser_count} "
+                          f"IdeaBrowser candidates, cancelling remaining fetches")
+                    break
+        finally:
+            stream.close()
+            db.close()
         
-        # Sort by quality score (highest first)
-        filtered_ideas.sort(key=lambda x: x['quality_score'], reverse=True)
+        self._print_collection_report(counts, started)
+        candidates.sort(key=lambda x: x['quality_score'], reverse=True)
+        print(f"✅ Found {len(candidates)} unique, high-quality ideas")
+        return candidates
+    
+    def _print_collection_report(self, counts: Counter, started: float):
+        ideabrowser_count = sum(n for source, n in counts.items() if source.startswith('ideabrowser'))
+        print(f"✅ Collected {ideabrowser_count} ideas from IdeaBrowser")
+        print(f"✅ Collected {counts['hackernews']} ideas from Hacker News")
+        print(f"✅ Collected {counts['hackernews_showhn']} Show HN ideas")
+        print(f"✅ Collected {counts['producthunt']} ideas from Product Hunt")
+        
+        print(f"⏱️ Collection finished in {time.monotonic() - started:.1f}s")
+        self.http_session.print_stats()
+        self.http_cache.print_stats()
+        self.page_archive.print_stats()
+        self.circuit_breakers.print_stats()
+        self.parse_pool.print_stats()
+        self.ideabrowser_scraper.selector_plans.print_stats()
+        self.ideabrowser_scraper.dead_urls.print_stats()
+        self.frontier.print_stats()
+    
+    def _enrich_top_candidates(self, ideas: List[Dict], top_n: Optional[int] = None) -> List[Dict]:
+        """Fetch detail pages for the top-N candidates in parallel, then re-score and re-rank"""
+        top_n = top_n or self.enrich_top_n
+        top_ideas = [idea for idea in ideas[:top_n] if self._get_details_fetcher(idea)]
+        if not top_ideas:
+            return ideas
+        
+        print(f"🔎 Enriching top {len(top_ideas)} candidates with detail pages...")
+        enriched = 0
+        with ThreadPoolExecutor(max_workers=self.enrich_workers) as pool:
+            futures = {
+                pool.submit(self._get_details_fetcher(idea), idea['url']): idea
+                for idea in top_ideas
+            }
+            for future in as_completed(futures):
+                idea = futures[future]
+                try:
+                    details = future.result()
+                except Exception as e:
+                    print(f"⚠️ Could not enrich {idea.get('title', '')[:50]}: {e}")
+                    continue
+                
+                if details and len(details.get('content', '')) > len(idea.get('content', '')):
+                    idea['content'] = details['content']
+                    if not idea.get('category') and details.get('category'):
+                        idea['category'] = details['category']
+                    idea['quality_score'] = self._calculate_idea_score(idea)
+                    enriched += 1
+        
+        ideas.sort(key=lambda x: x['quality_score'], reverse=True)
+        print(f"✅ Enriched {enriched} candidates")
+        return ideas
+    
+    def _triage_candidates(self, ideas: List[Dict]) -> List[Dict]:
+        """Reorder the candidates `_select_best_idea` chooses from by triage viability"""
+        preferred = [idea for idea in ideas if 'ideabrowser' in idea.get('source_type', '')] or ideas
+        ranked = self.triage.rerank(preferred)
+        ranked_ids = {id(idea) for idea in ranked}
+        return ranked + [idea for idea in ideas if id(idea) not in ranked_ids]
+    
+    def _get_details_fetcher(self, idea: Dict):
+        """Detail-page scraper method for an idea's source, if its URL can be fetched"""
+        url = idea.get('url', '')
+        if not url.startswith('http'):
+            return None
         
-        print(f"✅ Filtered to {len(filtered_ideas)} high-quality ideas")
-        return filtered_ideas
+        source_type = idea.get('source_type', '')
+        if 'ideabrowser' in source_type:
+            # Listing items without their own link point back at the home page
+            if url.rstrip('/') == self.ideabrowser_scraper.base_url:
+                return None
+            return self.ideabrowser_scraper.get_idea_details
+        elif 'producthunt' in source_type:
+            return self.ph_scraper.get_product_details
+        elif 'hackernews' in source_type:
+            return self.hn_scraper.get_idea_details
+        return None
     
     def _calculate_idea_score(self, idea: Dict) -> float:
         """Calculate a quality score for an idea (mimicking ideabrowser.com scoring)"""
@@ -188,27 +390,6 @@ class IdeaDiscoveryAgent:
         
         return max(score, 0)  # Don't allow negative scores
     
-    def _check_duplicates(self, ideas: List[Dict]) -> List[Dict]:
-        """Check for duplicates in the database"""
-        db = next(get_db())
-        unique_ideas = []
-        
-        try:
-            for idea in ideas:
-                # Create a temporary title for checking
-                temp_title = idea.get('title', '')[:100]
-                
-                # Check if this idea is already in the database
-                if not self.ai_processor.check_duplicate(temp_title, db):
-                    unique_ideas.append(idea)
-                else:
-                    print(f"⚠️ Skipping duplicate: {temp_title[:50]}...")
-        finally:
-            db.close()
-        
-        print(f"✅ Found {len(unique_ideas)} unique ideas")
-        return unique_ideas
-    
     def _select_best_idea(self, ideas: List[Dict]) -> Optional[Dict]:
         """Select the best idea from the filtered list (mimicking ideabrowser.com selection)"""
         if not ideas:
@@ -226,37 +407,92 @@ class IdeaDiscoveryAgent:
         print(f"🎯 Selected best idea: {best_idea.get('title', '')[:50]}...")
         return best_idea
     
+    def reprocess_archive(self, since: Optional[float] = None) -> List[Dict]:
+        """Re-run the extractors and scoring over archived pages, ranked best first.
+        
+        Uses no network, ignores the frontier and probes selectors from scratch,
+        so changed extraction or scoring rules show their full effect.
+        """
+        with tempfile.TemporaryDirectory() as scratch:
+            selector_plans = SelectorPlanStore(path=os.path.join(scratch, 'selector_plans.json'))
+            scrapers = [
+                IdeaBrowserParser(selector_plans=selector_plans),
+                HackerNewsScraper(fetcher=self.fetcher),
+                ProductHuntParser(),
+            ]
+            parsers = {urlparse(scraper.base_url).netloc: scraper.parse_page for scraper in scrapers}
+            parsers[urlparse(scrapers[1].api_base_url).netloc] = scrapers[1].parse_page
+            
+            started = time.monotonic()
+            pages = 0
+            ideas_by_url = {}
+            for url, fetched_at, content in self.page_archive.iter_pages(since):
+                parse_page = parsers.get(urlparse(url).netloc)
+                if parse_page is None:
+                    continue
+                pages += 1
+                try:
+                    ideas = parse_page(url, content)
+                except Exception as e:
+                    print(f"⚠️ Could not reprocess {url}: {e}")
+                    continue
+                for idea in ideas:
+                    # Later crawls of the same item replace earlier ones
+                    ideas_by_url[idea.get('url') or idea.get('title', '')] = idea
+        
+        ideas = list(ideas_by_url.values())
+        for idea in ideas:
+            idea['quality_score'] = self._calculate_idea_score(idea)
+        ideas.sort(key=lambda x: x['quality_score'], reverse=True)
+        print(f"♻️ Reprocessed {pages} archived pages into {len(ideas)} ideas "
+              f"in {time.monotonic() - started:.2f}s")
+        selector_plans.print_stats()
+        return ideas
+    
     def get_ideas_by_category(self, category: str, limit: int = 10) -> List[Dict]:
         """Get ideas from a specific category (mimicking ideabrowser.com category browsing)"""
         ideas = []
         
         try:
-            # Get ideas from ideabrowser.com by category
-            category_ideas = self.ideabrowser_scraper.get_ideas_by_category(category, limit)
-            ideas.extend(category_ideas)
-            
-            # Also search for category-related ideas in other sources
-            search_terms = [category, f"{category} startup", f"{category} app"]
-            for term in search_terms:
-                search_ideas = self.ideabrowser_scraper.search_ideas(term, limit//len(search_terms))
-                ideas.extend(search_ideas)
+            # Category and search pages overlap, so share fetches within one run
+            with self.fetcher.run():
+                # Get ideas from ideabrowser.com by category
+                category_ideas = self.ideabrowser_scraper.get_ideas_by_category(category, limit)
+                ideas.extend(category_ideas)
+                
+                # Also search for category-related ideas in other sources
+                search_terms = [category, f"{category} startup", f"{category} app"]
+                for term in search_terms:
+                    search_ideas = self.ideabrowser_scraper.search_ideas(term, limit//len(search_terms))
+                    ideas.extend(search_ideas)
                 
         except Exception as e:
             print(f"❌ Error getting ideas by category {category}: {e}")
         
         return ideas
     
+    def close(self):
+        """Release what the agent holds open between runs: the OpenAI client's loop and connections
+        and the parse workers"""
+        self.ai_processor.close()
+        self.parse_pool.close()
+    
     def save_idea_to_database(self, processed_idea: Dict) -> bool:
         """Save the processed idea to the database"""
         try:
             db = next(get_db())
             
+            # Fresh results carry a datetime, results read back from JSON an ISO string
+            published_at = processed_idea['published_at']
+            if isinstance(published_at, str):
+                published_at = datetime.fromisoformat(published_at)
+            
             # Create new idea record
             new_idea = Idea(
                 idea_title=processed_idea['idea_title'],
                 source_url=processed_idea['source_url'],
                 summary_kr=processed_idea['summary_kr'],
-                published_at=datetime.fromisoformat(processed_idea['published_at']),
+                published_at=published_at,
                 language=processed_idea['language'],
                 source_type=processed_idea['source_type'],
                 archived=False
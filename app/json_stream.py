@@ -0,0 +1,207 @@
+import json
+from typing import Any, Dict, List, Tuple
+
+_ESCAPES = {'"': '"', '\\': '\\', '/': '/', 'b': '\b', 'f': '\f', 'n': '\n', 'r': '\r', 't': '\t'}
+_WHITESPACE = ' \t\r\n'
+
+
+class MalformedStream(ValueError):
+    """Raised as soon as streamed text can no longer become the expected JSON object"""
+
+
+class JSONFieldStream:
+    """Incremental parser for one flat JSON object arriving in arbitrary chunks.
+
+    `feed()` returns the events the new text completes: `('delta', key, text)`
+    for every piece of a string value as it is decoded, and `('field', key,
+    value)` once a value is complete. Non-string values are collected and
+    decoded with `json.loads` when they end. A leading Markdown code fence is
+    tolerated; anything else that cannot start or continue the object raises
+    `MalformedStream` right away instead of after the full generation.
+    Literal newlines inside strings are accepted, like `json.loads(strict=False)`.
+    """
+
+    def __init__(self):
+        self.fields: Dict[str, Any] = {}
+        self._state = 'start'
+        self._key = ''
+        self._buffer: List[str] = []
+        self._escape = ''
+        self._high = ''
+        self._raw: List[str] = []
+        self._depth = 0
+        self._raw_in_string = False
+        self._raw_escape = False
+        self._fence = False
+
+    @property
+    def done(self) -> bool:
+        return self._state == 'done'
+
+    def feed(self, text: str) -> List[Tuple]:
+        events: List[Tuple] = []
+        delta: List[str] = []
+        for char in text:
+            state = self._state
+            if state == 'start':
+                if char in _WHITESPACE:
+                    continue
+                if char == '`':
+                    self._state = 'fence'
+                elif char == '{':
+                    self._state = 'key_or_end'
+                else:
+                    raise MalformedStream(f"expected '{{', got {char!r}")
+            elif state == 'fence':
+                # Skip "```json" up to the end of its line
+                self._fence = True
+                if char == '\n':
+                    self._state = 'start'
+            elif state in ('key_or_end', 'key'):
+                if char in _WHITESPACE:
+                    continue
+                if char == '"':
+                    self._state = 'key_string'
+                    self._buffer = []
+                elif char == '}' and state == 'key_or_end':
+                    self._state = 'done'
+                else:
+                    raise MalformedStream(f"expected a key, got {char!r}")
+            elif state == 'key_string':
+                if self._escape or char == '\\':
+                    decoded = self._decode_escape(char)
+                    if decoded:
+                        self._buffer.append(decoded)
+                elif char == '"':
+                    self._key = ''.join(self._buffer) + self._take_high()
+                    self._state = 'colon'
+                else:
+                    self._buffer.append(self._take_high() + char if self._high else char)
+            elif state == 'colon':
+                if char in _WHITESPACE:
+                    continue
+                if char != ':':
+                    raise MalformedStream(f"expected ':' after {self._key!r}, got {char!r}")
+                self._state = 'value'
+            elif state == 'value':
+                if char in _WHITESPACE:
+                    continue
+                if char == '"':
+                    self._state = 'string'
+                    self._buffer = []
+                elif char in ',}]:':
+                    raise MalformedStream(f"expected a value for {self._key!r}, got {char!r}")
+                else:
+                    self._state = 'raw'
+                    self._raw = []
+                    self._depth = 0
+                    self._raw_in_string = False
+                    self._raw_escape = False
+                    self._feed_raw(char, events)
+            elif state == 'string':
+                if self._escape or char == '\\':
+                    decoded = self._decode_escape(char)
+                    if decoded:
+                        self._buffer.append(decoded)
+                        delta.append(decoded)
+                elif char == '"':
+                    if self._high:
+                        high = self._take_high()
+                        self._buffer.append(high)
+                        delta.append(high)
+                    if delta:
+                        events.append(('delta', self._key, ''.join(delta)))
+                        delta = []
+                    value = ''.join(self._buffer)
+                    self.fields[self._key] = value
+                    events.append(('field', self._key, value))
+                    self._state = 'after_value'
+                else:
+                    if self._high:
+                        char = self._take_high() + char
+                    self._buffer.append(char)
+                    delta.append(char)
+            elif state == 'raw':
+                self._feed_raw(char, events)
+            elif state == 'after_value':
+                if char in _WHITESPACE:
+                    continue
+                if char == ',':
+                    self._state = 'key'
+                elif char == '}':
+                    self._state = 'done'
+                else:
+                    raise MalformedStream(f"expected ',' or '}}' after {self._key!r}, got {char!r}")
+            elif state == 'done':
+                if char not in _WHITESPACE and not (self._fence and char == '`'):
+                    raise MalformedStream(f"unexpected {char!r} after the object")
+        if delta:
+            events.append(('delta', self._key, ''.join(delta)))
+        return events
+
+    def _decode_escape(self, char: str) -> str:
+        """Consume one character of an escape sequence; returns the decoded text once complete.
+
+        A `\\uD800`-`\\uDBFF` escape is held back until the next character so
+        that an escaped surrogate pair decodes to one code point, as in `json.loads`.
+        """
+        if not self._escape:
+            self._escape = '\\'
+            return ''
+        self._escape += char
+        if self._escape[1] == 'u':
+            if len(self._escape) < 6:
+                return ''
+            try:
+                code = int(self._escape[2:], 16)
+            except ValueError:
+                raise MalformedStream(f"bad escape {self._escape!r}")
+            self._escape = ''
+            if 0xD800 <= code < 0xDC00:
+                pending, self._high = self._high, chr(code)
+                return pending
+            if 0xDC00 <= code < 0xE000 and self._high:
+                high = ord(self._take_high())
+                return chr(0x10000 + ((high - 0xD800) << 10) + (code - 0xDC00))
+            return self._take_high() + chr(code)
+        elif self._escape[1] in _ESCAPES:
+            decoded = _ESCAPES[self._escape[1]]
+        else:
+            raise MalformedStream(f"bad escape {self._escape!r}")
+        self._escape = ''
+        return self._take_high() + decoded
+
+    def _take_high(self) -> str:
+        """Release a held-back high surrogate that no low surrogate followed"""
+        high, self._high = self._high, ''
+        return high
+
+    def _feed_raw(self, char: str, events: List[Tuple]):
+        if self._raw_in_string:
+            if self._raw_escape:
+                self._raw_escape = False
+            elif char == '\\':
+                self._raw_escape = True
+            elif char == '"':
+                self._raw_in_string = False
+        elif char == '"':
+            self._raw_in_string = True
+        elif char in '[{':
+            self._depth += 1
+        elif char in ']}' and self._depth > 0:
+            self._depth -= 1
+        elif self._depth == 0 and (char in ',}' or char in _WHITESPACE):
+            raw = ''.join(self._raw)
+            try:
+                value = json.loads(raw)
+            except ValueError:
+                raise MalformedStream(f"bad value for {self._key!r}: {raw[:50]!r}")
+            self.fields[self._key] = value
+            events.append(('field', self._key, value))
+            self._state = 'after_value'
+            if char == '}':
+                self._state = 'done'
+            elif char == ',':
+                self._state = 'key'
+            return
+        self._raw.append(char)
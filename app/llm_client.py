@@ -0,0 +1,311 @@
+import asyncio
+import json
+import random
+import re
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import AsyncIterator, Awaitable, Callable, Dict, Optional
+
+import openai
+
+from app.storage import cache_path
+
+# Statuses worth another attempt; everything else is the caller's mistake
+RETRY_STATUSES = {408, 409, 429, 500, 502, 503, 504}
+
+_DURATION_PART = re.compile(r'(\d+(?:\.\d+)?)(ms|s|m|h)')
+_DURATION_UNITS = {'ms': 0.001, 's': 1, 'm': 60, 'h': 3600}
+
+
+class StreamInterrupted(Exception):
+    """Raised when a streamed completion fails after part of it was delivered, so it cannot be retried"""
+
+
+def _parse_duration(value: str) -> Optional[float]:
+    """Parse rate-limit reset values like `20ms`, `1.5s` or `6m0s` into seconds"""
+    parts = _DURATION_PART.findall(value)
+    if not parts:
+        return None
+    return sum(float(amount) * _DURATION_UNITS[unit] for amount, unit in parts)
+
+
+def retry_after(headers, rate_limited: bool = False) -> Optional[float]:
+    """Seconds the server asked us to wait before retrying, if it said so.
+
+    The `x-ratelimit-reset-*` headers say when a quota refills, which only
+    matters for a 429 (`rate_limited`); other errors only honour `retry-after`.
+    """
+    if not headers:
+        return None
+    value = headers.get('retry-after-ms')
+    if value:
+        try:
+            return float(value) / 1000
+        except ValueError:
+            pass
+    value = headers.get('retry-after')
+    if value:
+        try:
+            return float(value)
+        except ValueError:
+            try:
+                return max(parsedate_to_datetime(value).timestamp() - time.time(), 0)
+            except (TypeError, ValueError):
+                pass
+    if not rate_limited:
+        return None
+    resets = [
+        _parse_duration(headers.get(name, ''))
+        for name in ('x-ratelimit-reset-requests', 'x-ratelimit-reset-tokens')
+    ]
+    resets = [reset for reset in resets if reset is not None]
+    return max(resets) if resets else None
+
+
+class UsageLog:
+    """Token counts of every call, appended to a JSONL file so prompt changes can be measured.
+
+    Each line holds the model, prompt/completion tokens, how many prompt
+    tokens the provider served from its prefix cache, the latency and any
+    caller-supplied figures (e.g. content tokens before and after compaction).
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or cache_path('llm_usage.jsonl')
+        self.totals = {'calls': 0, 'prompt_tokens': 0, 'completion_tokens': 0, 'cached_tokens': 0}
+        self._lock = threading.Lock()
+
+    def record(self, model: str, usage, latency: float, meta: Optional[Dict] = None):
+        if usage is None:
+            return
+        details = getattr(usage, 'prompt_tokens_details', None)
+        if isinstance(details, dict):
+            cached_tokens = details.get('cached_tokens') or 0
+        else:
+            cached_tokens = getattr(details, 'cached_tokens', None) or 0
+        entry = {
+            'at': time.time(),
+            'model': model,
+            'prompt_tokens': usage.prompt_tokens,
+            'completion_tokens': usage.completion_tokens,
+            'cached_tokens': cached_tokens,
+            'latency': round(latency, 3),
+            **(meta or {})
+        }
+        with self._lock:
+            self.totals['calls'] += 1
+            self.totals['prompt_tokens'] += entry['prompt_tokens']
+            self.totals['completion_tokens'] += entry['completion_tokens']
+            self.totals['cached_tokens'] += cached_tokens
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(entry) + '\n')
+
+    def print_stats(self):
+        print(f"🧾 Tokens: {self.totals['prompt_tokens']} prompt ({self.totals['cached_tokens']} cached), "
+              f"{self.totals['completion_tokens']} completion over {self.totals['calls']} calls")
+
+
+class LLMClient:
+    """Long-lived async OpenAI client shared by every AI call of a process.
+
+    The client and its connection pool live on a private event loop running in
+    a background thread, so sync callers (`run`) and coroutines on any other
+    loop (`complete_async`) reuse the same keep-alive connections. A semaphore
+    bounds the requests in flight; 429s, 5xx and connection errors are retried
+    with full-jitter exponential backoff, waiting at least as long as the
+    server asks (quota reset headers only for 429s); a call the server wants
+    delayed beyond `backoff_cap` fails instead. Every attempt has its own `timeout`.
+    `stream_async` yields the content deltas of a completion as they arrive.
+    Token usage of every successful call is recorded in `usage`. `close()`
+    releases the connections, the loop and its thread.
+    """
+
+    def __init__(self, api_key: str, max_concurrency: int = 4, timeout: float = 60.0,
+                 max_retries: int = 4, backoff_base: float = 1.0, backoff_cap: float = 30.0,
+                 usage: Optional[UsageLog] = None, base_url: Optional[str] = None):
+        self.api_key = api_key
+        self.base_url = base_url
+        self.usage = usage or UsageLog()
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.stats = {'calls': 0, 'retries': 0, 'rate_limited': 0, 'failures': 0}
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._client: Optional[openai.AsyncOpenAI] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(target=loop.run_forever, name='llm-client', daemon=True)
+                self._thread.start()
+                self._loop = loop
+            return self._loop
+
+    def close(self):
+        """Close the connection pool, stop the loop and join its thread; a later call starts afresh"""
+        with self._lock:
+            loop, thread = self._loop, self._thread
+            self._loop = self._thread = None
+        if loop is None:
+            return
+        if self._client is not None:
+            try:
+                asyncio.run_coroutine_threadsafe(self._client.close(), loop).result(timeout=self.timeout)
+            except Exception as e:
+                print(f"⚠️ Could not close the OpenAI client cleanly: {e}")
+            self._client = self._slots = None
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+        loop.close()
+
+    def submit(self, coro):
+        """Schedule a coroutine on the client's loop; returns a `concurrent.futures.Future`"""
+        return asyncio.run_coroutine_threadsafe(coro, self._ensure_loop())
+
+    def run(self, coro):
+        """Run a coroutine on the client's loop and block until it finishes"""
+        return self.submit(coro).result()
+
+    async def complete_async(self, request: Dict, meta: Optional[Dict] = None) -> str:
+        """Chat completion awaitable from any event loop; `meta` is logged with its token usage"""
+        return await asyncio.wrap_future(self.submit(self._complete(request, meta)))
+
+    def complete(self, request: Dict, meta: Optional[Dict] = None) -> str:
+        """Blocking chat completion"""
+        return self.run(self._complete(request, meta))
+
+    async def stream_async(self, request: Dict, meta: Optional[Dict] = None) -> AsyncIterator[str]:
+        """Content deltas of a streamed chat completion, iterable from any event loop.
+
+        Retries only happen before the first delta arrives. Leaving the loop
+        early cancels the request, which stops the generation.
+        """
+        loop = asyncio.get_running_loop()
+        deltas: asyncio.Queue = asyncio.Queue()
+        finished = object()
+
+        def put(item):
+            loop.call_soon_threadsafe(deltas.put_nowait, item)
+
+        async def produce():
+            try:
+                await self._stream(request, put, meta)
+                put(finished)
+            except Exception as e:
+                put(e)
+
+        future = self.submit(produce())
+        try:
+            while True:
+                item = await deltas.get()
+                if item is finished:
+                    return
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            future.cancel()
+
+    def call(self, method: Callable[[openai.AsyncOpenAI], Awaitable]):
+        """Run one raw SDK call (files, batches, ...) on the shared client and block for its result"""
+        async def invoke():
+            return await method(self._ensure_client())
+        return self.run(invoke())
+
+    def _ensure_client(self) -> openai.AsyncOpenAI:
+        # Only called on the client's own loop, so the client and semaphore are bound to it
+        if self._client is None:
+            # Retries are ours, so the SDK's own are turned off
+            self._client = openai.AsyncOpenAI(api_key=self.api_key, base_url=self.base_url,
+                                              max_retries=0, timeout=self.timeout)
+            self._slots = asyncio.Semaphore(self.max_concurrency)
+        return self._client
+
+    def _backoff(self, attempt: int, error: Exception) -> Optional[float]:
+        """Jittered delay before the next attempt, or None if the server asked for more than `backoff_cap`"""
+        delay = random.uniform(0, min(self.backoff_cap, self.backoff_base * 2 ** attempt))
+        response = getattr(error, 'response', None)
+        requested = retry_after(response.headers if response is not None else None,
+                                rate_limited=isinstance(error, openai.RateLimitError))
+        if requested is not None:
+            if requested > self.backoff_cap:
+                # Waiting minutes for a quota reset is worse than failing over to a backup
+                return None
+            # Never earlier than the server asked; a little jitter spreads out the herd
+            delay = min(requested + random.uniform(0, self.backoff_base), self.backoff_cap)
+        return delay
+
+    def _retryable(self, error: Exception) -> bool:
+        if isinstance(error, (openai.APITimeoutError, openai.APIConnectionError)):
+            return True
+        return isinstance(error, openai.APIStatusError) and error.status_code in RETRY_STATUSES
+
+    async def _complete(self, request: Dict, meta: Optional[Dict] = None) -> str:
+        async def attempt(client: openai.AsyncOpenAI) -> str:
+            started = time.monotonic()
+            response = await client.chat.completions.create(**request, timeout=self.timeout)
+            self.usage.record(request.get('model'), response.usage, time.monotonic() - started, meta)
+            return response.choices[0].message.content
+        return await self._with_retries(attempt)
+
+    async def _stream(self, request: Dict, emit: Callable[[str], None], meta: Optional[Dict] = None):
+        async def attempt(client: openai.AsyncOpenAI):
+            delivered = False
+            started = time.monotonic()
+            stream = await client.chat.completions.create(
+                **request, stream=True, stream_options={'include_usage': True}, timeout=self.timeout
+            )
+            try:
+                async for chunk in stream:
+                    if chunk.choices and chunk.choices[0].delta.content:
+                        delivered = True
+                        emit(chunk.choices[0].delta.content)
+                    if chunk.usage:
+                        # Sent in a final chunk without choices
+                        self.usage.record(request.get('model'), chunk.usage, time.monotonic() - started, meta)
+            except Exception as e:
+                if delivered:
+                    raise StreamInterrupted(f"{type(e).__name__}: {e}") from e
+                raise
+            finally:
+                await stream.close()
+        await self._with_retries(attempt)
+
+    async def _with_retries(self, attempt: Callable[[openai.AsyncOpenAI], Awaitable]):
+        client = self._ensure_client()
+        retries = 0
+        while True:
+            async with self._slots:
+                try:
+                    self.stats['calls'] += 1
+                    return await attempt(client)
+                except Exception as e:
+                    error = e
+            if retries >= self.max_retries or not self._retryable(error):
+                self.stats['failures'] += 1
+                raise error
+            if isinstance(error, openai.RateLimitError):
+                self.stats['rate_limited'] += 1
+            delay = self._backoff(retries, error)
+            if delay is None:
+                print(f"⚠️ OpenAI call failed ({type(error).__name__}); the server asked to wait "
+                      f"longer than {self.backoff_cap:.0f}s, not retrying")
+                self.stats['failures'] += 1
+                raise error
+            print(f"⚠️ OpenAI call failed ({type(error).__name__}); retrying in {delay:.1f}s")
+            self.stats['retries'] += 1
+            retries += 1
+            # Sleep outside the semaphore so waiting calls do not hold a slot
+            await asyncio.sleep(delay)
+
+    def print_stats(self):
+        print(f"🤖 OpenAI: {self.stats['calls']} calls, {self.stats['retries']} retries "
+              f"({self.stats['rate_limited']} rate limited), {self.stats['failures']} failures")
+        self.usage.print_stats()
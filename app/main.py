@@ -1,9 +1,12 @@
 from fastapi import FastAPI, Request, Depends, HTTPException
-from fastapi.responses import HTMLResponse
+from fastapi.concurrency import run_in_threadpool
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import HTMLResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 from sqlalchemy.orm import Session
 from datetime import datetime, timedelta
+import json
 import os
 from dotenv import load_dotenv
 
@@ -197,6 +200,7 @@ async def discover_idea(db: Session = Depends(get_db)):
     if demo_mode:
         return {"success": True, "message": "Demo mode - discovery not available"}
     
+    agent = None
     try:
         agent = IdeaDiscoveryAgent()
         result = agent.discover_daily_idea()
@@ -213,6 +217,44 @@ async def discover_idea(db: Session = Depends(get_db)):
             
     except Exception as e:
         return {"success": False, "message": f"Error during discovery: {str(e)}"}
+    finally:
+        # Each request builds its own agent, so its OpenAI client must not outlive it
+        if agent is not None:
+            agent.close()
+
+@app.post("/discover/stream")
+async def discover_idea_stream():
+    """Manually trigger idea discovery, streaming the AI result as NDJSON events as it is generated"""
+    
+    # Check if we're in demo mode
+    demo_mode = not os.getenv("OPENAI_API_KEY") or os.getenv("OPENAI_API_KEY") == "your_openai_api_key_here"
+    
+    if demo_mode:
+        return {"success": True, "message": "Demo mode - discovery not available"}
+    
+    agent = IdeaDiscoveryAgent()
+    try:
+        best_idea = await run_in_threadpool(agent.select_daily_idea)
+    except Exception:
+        await run_in_threadpool(agent.close)
+        raise
+    
+    async def events():
+        try:
+            if not best_idea:
+                yield json.dumps({"event": "error", "message": "No suitable idea found"}) + "\n"
+                return
+            async for event in agent.ai_processor.stream_idea(best_idea):
+                if event['event'] == 'result':
+                    # Only now are today's candidates remembered as seen
+                    agent.frontier.commit()
+                    event['saved'] = await run_in_threadpool(agent.save_idea_to_database, event['idea'])
+                yield json.dumps(jsonable_encoder(event), ensure_ascii=False) + "\n"
+        finally:
+            # The agent, and its OpenAI client, only live as long as the response
+            await run_in_threadpool(agent.close)
+    
+    return StreamingResponse(events(), media_type="application/x-ndjson")
 
 @app.get("/health")
 async def health_check():
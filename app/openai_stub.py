@@ -0,0 +1,197 @@
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+
+from app.prompt_budget import count_tokens
+
+_TITLE_LINE = re.compile(r'^제목: (.*)$', re.MULTILINE)
+# Characters sent per streamed chunk; roughly one token of Korean text
+_CHUNK_CHARS = 3
+
+
+class OpenAIStubServer:
+    """Local server speaking the chat-completions protocol, for load and latency tests without network.
+
+    Answers `POST /v1/chat/completions`, streamed (SSE) or not, with usage.
+    `latency` is the delay before the first token and `tokens_per_second`
+    paces the rest. `error_rate` injects 500s, `rate_limit_rate` 429s with a
+    `retry-after-ms` header, and `malformed_rate` answers that are not JSON;
+    the first `fail_first` requests always get a 429, for deterministic
+    retry tests. Answers cycle through `responses` (canned JSON objects) or,
+    by default, are built from the candidate title found in the prompt.
+    """
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 0, latency: float = 0.0,
+                 tokens_per_second: float = 0.0, error_rate: float = 0.0, rate_limit_rate: float = 0.0,
+                 malformed_rate: float = 0.0, fail_first: int = 0, responses: Optional[List[Dict]] = None,
+                 seed: Optional[int] = None):
+        self.latency = latency
+        self.tokens_per_second = tokens_per_second
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.malformed_rate = malformed_rate
+        self.fail_first = fail_first
+        self.responses = responses or []
+        self.stats = {'requests': 0, 'streamed': 0, 'errors': 0, 'rate_limited': 0, 'malformed': 0}
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def start(self) -> 'OpenAIStubServer':
+        self._thread = threading.Thread(target=self._server.serve_forever, name='openai-stub', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> 'OpenAIStubServer':
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _decide(self) -> str:
+        """Outcome of the next request: 'error', 'rate_limited', 'malformed' or 'ok'"""
+        with self._lock:
+            self.stats['requests'] += 1
+            if self.stats['requests'] <= self.fail_first:
+                outcome = 'rate_limited'
+            else:
+                roll = self._random.random()
+                if roll < self.error_rate:
+                    outcome = 'error'
+                elif roll < self.error_rate + self.rate_limit_rate:
+                    outcome = 'rate_limited'
+                elif roll < self.error_rate + self.rate_limit_rate + self.malformed_rate:
+                    outcome = 'malformed'
+                else:
+                    outcome = 'ok'
+            if outcome != 'ok':
+                self.stats['errors' if outcome == 'error' else outcome] += 1
+            return outcome
+
+    def _answer(self, request: Dict) -> str:
+        with self._lock:
+            if self.responses:
+                response = self.responses[(self.stats['requests'] - 1) % len(self.responses)]
+                return json.dumps(response, ensure_ascii=False)
+        prompt = '\n'.join(str(message.get('content', '')) for message in request.get('messages', []))
+        match = _TITLE_LINE.search(prompt)
+        title = match.group(1).strip() if match else '해외 스타트업 아이디어'
+        return json.dumps({
+            'idea_title': f"[스텁] {title}",
+            'summary_kr': f"🚀 오늘의 창업 아이디어\n\n💡 아이디어 핵심\n• {title}\n\n"
+                          f"🎯 시장 기회\n• 로컬 스텁 서버가 생성한 응답입니다."
+        }, ensure_ascii=False)
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+                if self.path.rstrip('/') != '/v1/chat/completions':
+                    return self._json(404, {'error': {'message': f"unknown path {self.path}"}})
+                request = json.loads(body or b'{}')
+
+                outcome = stub._decide()
+                if outcome == 'error':
+                    return self._json(500, {'error': {'message': 'injected server error', 'type': 'server_error'}})
+                if outcome == 'rate_limited':
+                    return self._json(429, {'error': {'message': 'injected rate limit', 'type': 'requests'}},
+                                      {'retry-after-ms': '100'})
+
+                content = stub._answer(request)
+                if outcome == 'malformed':
+                    content = "Sure! Here is the idea: " + content[:len(content) // 2]
+                usage = {
+                    'prompt_tokens': sum(count_tokens(str(message.get('content', '')))
+                                         for message in request.get('messages', [])),
+                    'completion_tokens': count_tokens(content)
+                }
+                usage['total_tokens'] = usage['prompt_tokens'] + usage['completion_tokens']
+
+                time.sleep(stub.latency)
+                if request.get('stream'):
+                    with stub._lock:
+                        stub.stats['streamed'] += 1
+                    return self._stream(request, content, usage)
+                if stub.tokens_per_second:
+                    time.sleep(usage['completion_tokens'] / stub.tokens_per_second)
+                self._json(200, {
+                    'id': f"chatcmpl-{uuid.uuid4().hex}",
+                    'object': 'chat.completion',
+                    'created': int(time.time()),
+                    'model': request.get('model', 'stub'),
+                    'choices': [{'index': 0, 'finish_reason': 'stop',
+                                 'message': {'role': 'assistant', 'content': content}}],
+                    'usage': usage
+                })
+
+            def _stream(self, request: Dict, content: str, usage: Dict):
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/event-stream')
+                self.send_header('Transfer-Encoding', 'chunked')
+                self.end_headers()
+                chunk_id = f"chatcmpl-{uuid.uuid4().hex}"
+                delay = _CHUNK_CHARS / stub.tokens_per_second if stub.tokens_per_second else 0
+
+                def event(choices: List[Dict], extra: Optional[Dict] = None):
+                    data = {'id': chunk_id, 'object': 'chat.completion.chunk', 'created': int(time.time()),
+                            'model': request.get('model', 'stub'), 'choices': choices, **(extra or {})}
+                    self._chunk(f"data: {json.dumps(data, ensure_ascii=False)}\n\n")
+
+                try:
+                    for start in range(0, len(content), _CHUNK_CHARS):
+                        event([{'index': 0, 'delta': {'content': content[start:start + _CHUNK_CHARS]},
+                                'finish_reason': None}])
+                        time.sleep(delay)
+                    event([{'index': 0, 'delta': {}, 'finish_reason': 'stop'}])
+                    if (request.get('stream_options') or {}).get('include_usage'):
+                        event([], {'usage': usage})
+                    self._chunk("data: [DONE]\n\n")
+                    self._chunk("")
+                except (BrokenPipeError, ConnectionResetError):
+                    # The client stopped reading, e.g. after a malformed prefix
+                    self.close_connection = True
+
+            def _chunk(self, text: str):
+                data = text.encode('utf-8')
+                self.wfile.write(f"{len(data):x}\r\n".encode('ascii') + data + b"\r\n")
+                self.wfile.flush()
+
+            def _json(self, status: int, payload: Dict, headers: Optional[Dict] = None):
+                data = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def print_stats(self):
+        print(f"🧪 OpenAI stub: {self.stats['requests']} requests ({self.stats['streamed']} streamed), "
+              f"{self.stats['errors']} errors, {self.stats['rate_limited']} rate limited, "
+              f"{self.stats['malformed']} malformed")
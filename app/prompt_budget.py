@@ -0,0 +1,160 @@
+import os
+import re
+import threading
+from typing import NamedTuple, Optional
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+_encodings = {}
+_encodings_lock = threading.Lock()
+
+# Whole lines that scraped pages repeat on every page and carry no idea content;
+# a line is only dropped if every `|`/`·` separated part of it is one of these
+_BOILERPLATE = re.compile(
+    r'(?:(?:accept (?:all )?)?cookies?(?: (?:policy|settings|preferences))?|we use cookies\b.*|'
+    r'sign ?up(?: (?:now|for free))?|log ?in|log ?out|sign ?in|sign ?out|register|'
+    r'subscribe(?: now| to (?:our|the) newsletter)?|(?:join |sign up for )?(?:our |the )?newsletter|'
+    r'privacy(?: policy)?|terms(?: of (?:service|use))?|(?:all rights reserved|copyright|©).*|'
+    r'share(?: (?:on|this)(?: \w+)?)?|follow us(?: on \w+)?|read more|load more|show more|'
+    r'skip to (?:main )?content|back to top|advertisement)[\s.!:…»›→]*',
+    re.IGNORECASE
+)
+_BOILERPLATE_SEPARATORS = re.compile(r'\s*[|·•]\s*')
+_BOILERPLATE_MAX_CHARS = 80
+_SPACES = re.compile(r'[ \t\u00a0\u200b]+')
+_SENTENCE_END = re.compile(r'[.!?。]\s|\n')
+
+
+def _load_encoding(encoding_name: str, timeout: float):
+    """tiktoken's encoding, or None if it is not loaded within `timeout` seconds.
+
+    The BPE file is downloaded on first use and cached by tiktoken; the load
+    runs in a daemon thread so an unreachable download host costs `timeout`
+    once per process and can still finish and fill the cache for the next run.
+    """
+    loaded = {}
+
+    def load():
+        try:
+            loaded['encoding'] = tiktoken.get_encoding(encoding_name)
+        except Exception as e:
+            loaded['error'] = e
+
+    thread = threading.Thread(target=load, name='tiktoken-load', daemon=True)
+    thread.start()
+    thread.join(timeout)
+    if 'encoding' in loaded:
+        return loaded['encoding']
+    print(f"⚠️ tiktoken unavailable ({loaded.get('error', 'timed out')}); estimating token counts")
+    return None
+
+
+def _encoding(model: str):
+    if model in _encodings:
+        return _encodings[model]
+    with _encodings_lock:
+        if model in _encodings:
+            return _encodings[model]
+        encoding = None
+        timeout = float(os.getenv('TIKTOKEN_LOAD_TIMEOUT', '5'))
+        # A timeout of 0 is the offline switch: always estimate
+        if tiktoken is not None and timeout > 0:
+            try:
+                encoding_name = tiktoken.encoding_name_for_model(model)
+            except KeyError:
+                encoding_name = 'cl100k_base'
+            encoding = _load_encoding(encoding_name, timeout)
+        _encodings[model] = encoding
+        return encoding
+
+
+def count_tokens(text: str, model: str = 'gpt-4') -> int:
+    """Token count of `text` for `model`; a conservative estimate when tiktoken is not available"""
+    encoding = _encoding(model)
+    if encoding is None:
+        # ~4 characters per token for English, about one per character for Korean
+        ascii_chars = sum(1 for char in text if ord(char) < 128)
+        return ascii_chars // 4 + (len(text) - ascii_chars) + 1
+    return len(encoding.encode(text))
+
+
+# USD per 1K prompt / completion tokens; unknown models are priced like GPT-4 to stay conservative
+MODEL_PRICES = {
+    'gpt-4': (0.03, 0.06),
+    'gpt-4-turbo': (0.01, 0.03),
+    'gpt-4o': (0.0025, 0.01),
+    'gpt-4o-mini': (0.00015, 0.0006),
+    'gpt-3.5-turbo': (0.0005, 0.0015),
+}
+
+
+def estimate_cost(model: str, prompt_tokens: int, completion_tokens: int) -> float:
+    """Upper-bound USD cost of one call, matching the longest known model name prefix"""
+    prices = MODEL_PRICES['gpt-4']
+    for name in sorted(MODEL_PRICES, key=len, reverse=True):
+        if model.startswith(name):
+            prices = MODEL_PRICES[name]
+            break
+    return (prompt_tokens * prices[0] + completion_tokens * prices[1]) / 1000
+
+
+class CompactedContent(NamedTuple):
+    text: str
+    raw_tokens: int
+    tokens: int
+
+
+def normalize_content(content: str) -> str:
+    """Collapse whitespace and drop empty, repeated and boilerplate lines of scraped text"""
+    seen = set()
+    lines = []
+    for line in content.splitlines():
+        line = _SPACES.sub(' ', line).strip()
+        if not line:
+            continue
+        key = line.lower()
+        if key in seen:
+            continue
+        if len(line) <= _BOILERPLATE_MAX_CHARS and _is_boilerplate(line):
+            continue
+        seen.add(key)
+        lines.append(line)
+    return '\n'.join(lines)
+
+
+def _is_boilerplate(line: str) -> bool:
+    parts = [part for part in _BOILERPLATE_SEPARATORS.split(line) if part]
+    return bool(parts) and all(_BOILERPLATE.fullmatch(part) for part in parts)
+
+
+def compact_content(content: str, budget: int, model: str = 'gpt-4') -> CompactedContent:
+    """Normalize scraped content and cut it to at most `budget` tokens, at a sentence boundary if possible"""
+    raw_tokens = count_tokens(content, model) if content else 0
+    text = normalize_content(content)
+    tokens = count_tokens(text, model) if text else 0
+    if tokens > budget:
+        text = _truncate(text, budget, model)
+        tokens = count_tokens(text, model)
+    return CompactedContent(text, raw_tokens, tokens)
+
+
+def _truncate(text: str, budget: int, model: str) -> str:
+    # Binary search for the longest prefix within budget, leaving room for the ellipsis
+    low, high = 0, len(text)
+    while low < high:
+        middle = (low + high + 1) // 2
+        if count_tokens(text[:middle], model) <= budget - 1:
+            low = middle
+        else:
+            high = middle - 1
+    prefix = text[:low]
+    boundary: Optional[int] = None
+    for match in _SENTENCE_END.finditer(prefix):
+        boundary = match.start() + 1
+    # Only back off to a sentence end if that keeps most of the budget
+    if boundary is not None and boundary >= low * 0.7:
+        prefix = prefix[:boundary]
+    return prefix.rstrip() + '…'
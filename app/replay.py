@@ -0,0 +1,118 @@
+import base64
+import gzip
+import hashlib
+import json
+import threading
+import time
+from typing import Dict, List, Optional
+
+import requests
+
+from app.scrapers.http_cache import build_response
+
+RECORD, REPLAY = 'record', 'replay'
+
+
+class ReplayMiss(Exception):
+    """Raised when a replayed run asks for something the bundle never recorded"""
+
+
+def _llm_key(request: Dict) -> str:
+    return hashlib.sha256(json.dumps(request, sort_keys=True, ensure_ascii=False).encode('utf-8')).hexdigest()
+
+
+class FixtureBundle:
+    """HTTP responses and LLM completions of one discovery run, stored as gzip-compressed JSON.
+
+    In record mode the fetcher and the AI processor add everything they get
+    back from the network; in replay mode they answer from the bundle instead,
+    with no rate limiting, deadlines or sleeps. Completions are matched by
+    request; a request that changed since the recording raises `ReplayMiss`
+    rather than answering with a completion recorded for another candidate.
+    """
+
+    def __init__(self, path: str, mode: str, seed: Optional[int] = None):
+        self.path = path
+        self.mode = mode
+        self.seed = seed
+        self.recorded_at: Optional[float] = None
+        self.stats = {'http_hits': 0, 'http_misses': 0, 'llm_hits': 0, 'llm_misses': 0}
+        self._lock = threading.Lock()
+        self._http: Dict[str, Dict] = {}
+        self._llm: List[Dict] = []
+
+    @classmethod
+    def record(cls, path: str, seed: int) -> 'FixtureBundle':
+        return cls(path, RECORD, seed)
+
+    @classmethod
+    def load(cls, path: str) -> 'FixtureBundle':
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            data = json.load(f)
+        bundle = cls(path, REPLAY, data.get('seed'))
+        bundle.recorded_at = data.get('recorded_at')
+        bundle._http = data.get('http', {})
+        bundle._llm = data.get('llm', [])
+        return bundle
+
+    @property
+    def replaying(self) -> bool:
+        return self.mode == REPLAY
+
+    def record_http(self, url: str, response: Optional[requests.Response] = None, error: Optional[Exception] = None):
+        if error is not None:
+            entry = {'error': f"{type(error).__name__}: {error}"}
+        else:
+            entry = {
+                'status': response.status_code,
+                'headers': dict(response.headers),
+                'body': base64.b64encode(response.content).decode('ascii'),
+                'redirected': bool(response.history)
+            }
+        with self._lock:
+            self._http[url] = entry
+
+    def replay_http(self, url: str) -> requests.Response:
+        with self._lock:
+            entry = self._http.get(url)
+            self.stats['http_hits' if entry is not None else 'http_misses'] += 1
+        if entry is None:
+            raise ReplayMiss(url)
+        if 'error' in entry:
+            raise requests.ConnectionError(entry['error'])
+        response = build_response(url, entry['status'], entry['headers'], base64.b64decode(entry['body']))
+        if entry.get('redirected'):
+            # Only the presence of a redirect matters downstream (dead URL detection)
+            response.history = [build_response(url, 302, {}, b'')]
+        return response
+
+    def record_llm(self, request: Dict, content: str):
+        with self._lock:
+            self._llm.append({'key': _llm_key(request), 'model': request.get('model'), 'content': content})
+
+    def replay_llm(self, request: Dict) -> str:
+        key = _llm_key(request)
+        with self._lock:
+            for entry in self._llm:
+                if entry['key'] == key:
+                    self.stats['llm_hits'] += 1
+                    return entry['content']
+            self.stats['llm_misses'] += 1
+        raise ReplayMiss(f"LLM request {key[:12]}")
+
+    def save(self):
+        with self._lock:
+            data = {
+                'version': 1,
+                'recorded_at': time.time(),
+                'seed': self.seed,
+                'http': self._http,
+                'llm': self._llm
+            }
+        with gzip.open(self.path, 'wt', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False)
+        print(f"📼 Saved {len(data['http'])} HTTP responses and {len(data['llm'])} LLM completions to {self.path}")
+
+    def print_stats(self):
+        print(f"📼 Replay: {self.stats['http_hits']} HTTP hits, {self.stats['http_misses']} misses; "
+              f"{self.stats['llm_hits']} LLM hits, {self.stats['llm_misses']} misses")
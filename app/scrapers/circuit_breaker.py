@@ -0,0 +1,133 @@
+import json
+import os
+import threading
+import time
+from typing import Dict, Optional
+from urllib.parse import urlparse
+
+from app.storage import cache_path
+
+CLOSED, OPEN, HALF_OPEN = 'closed', 'open', 'half_open'
+
+
+class CircuitOpen(Exception):
+    """Raised instead of fetching from a host whose circuit breaker is open"""
+
+
+class CircuitBreakerStore:
+    """Per-host circuit breakers and latency history, persisted across runs.
+
+    Each scraper talks to one host, so a host's breaker is also its source's
+    breaker. `failure_threshold` consecutive failures (connection errors,
+    timeouts, 429/5xx) open the circuit; while open, fetches to that host fail
+    immediately with `CircuitOpen`. After `cooldown` seconds a single
+    half-open probe is let through: success closes the circuit, failure opens
+    it again. Timeouts adapt to the host's recent latencies (p95 times
+    `timeout_factor`), with the caller's timeout as the ceiling. Hosts not
+    fetched for `idle_ttl` seconds (e.g. article hosts reached once during
+    enrichment) are dropped when the store is saved, so it only keeps the
+    hosts that are crawled regularly.
+    """
+
+    def __init__(self, path: Optional[str] = None, failure_threshold: int = 3,
+                 cooldown: float = 15 * 60, latency_window: int = 50, min_samples: int = 5,
+                 timeout_factor: float = 3.0, min_timeout: float = 2.0, probe_timeout: float = 60.0,
+                 idle_ttl: float = 7 * 24 * 3600):
+        self.path = path or cache_path('circuit_breakers.json')
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.latency_window = latency_window
+        self.min_samples = min_samples
+        self.timeout_factor = timeout_factor
+        self.min_timeout = min_timeout
+        self.probe_timeout = probe_timeout
+        self.idle_ttl = idle_ttl
+        self.stats = {'skipped': 0, 'opened': 0, 'probes': 0, 'closed': 0}
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._hosts: Dict[str, Dict] = {}
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, 'r') as f:
+                    self._hosts = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"Ignoring unreadable circuit breakers {self.path}: {e}")
+
+    def _host(self, url: str) -> Dict:
+        host = urlparse(url).netloc
+        state = self._hosts.get(host)
+        if state is None:
+            state = {'state': CLOSED, 'failures': 0, 'opened_at': 0.0, 'latencies': []}
+            self._hosts[host] = state
+        return state
+
+    def allow(self, url: str) -> bool:
+        """False if the host's circuit is open; lets one half-open probe through after the cooldown"""
+        with self._lock:
+            state = self._host(url)
+            if state['state'] == CLOSED:
+                return True
+            now = time.time()
+            if state['state'] == OPEN and now - state['opened_at'] >= self.cooldown:
+                state['state'] = HALF_OPEN
+                state.pop('probe_started', None)
+            if state['state'] == HALF_OPEN and now - state.get('probe_started', 0.0) >= self.probe_timeout:
+                # One probe at a time; a probe that never reported back is replaced
+                state['probe_started'] = now
+                self.stats['probes'] += 1
+                return True
+            self.stats['skipped'] += 1
+            return False
+
+    def timeout_for(self, url: str, timeout: float) -> float:
+        """Timeout scaled to the host's observed p95 latency, never above `timeout`"""
+        with self._lock:
+            latencies = sorted(self._host(url)['latencies'])
+        if len(latencies) < self.min_samples:
+            return timeout
+        p95 = latencies[int(0.95 * (len(latencies) - 1))]
+        return min(timeout, max(self.min_timeout, p95 * self.timeout_factor))
+
+    def record_success(self, url: str, latency: float):
+        with self._lock:
+            state = self._host(url)
+            if state['state'] != CLOSED:
+                self.stats['closed'] += 1
+                print(f"🟢 Circuit closed for {urlparse(url).netloc}")
+            state.update({'state': CLOSED, 'failures': 0, 'last_seen': time.time()})
+            state.pop('probe_started', None)
+            state['latencies'] = (state['latencies'] + [round(latency, 3)])[-self.latency_window:]
+            self._dirty = True
+
+    def record_failure(self, url: str):
+        with self._lock:
+            state = self._host(url)
+            state['failures'] += 1
+            state['last_seen'] = time.time()
+            if state['state'] == HALF_OPEN or state['failures'] >= self.failure_threshold:
+                if state['state'] != OPEN:
+                    self.stats['opened'] += 1
+                    print(f"🔴 Circuit opened for {urlparse(url).netloc} after {state['failures']} failures")
+                state.update({'state': OPEN, 'opened_at': time.time()})
+                state.pop('probe_started', None)
+            self._dirty = True
+
+    def save(self):
+        with self._lock:
+            if not self._dirty:
+                return
+            now = time.time()
+            self._hosts = {host: state for host, state in self._hosts.items()
+                           if now - state.get('last_seen', 0.0) < self.idle_ttl}
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump(self._hosts, f, indent=2, sort_keys=True)
+            os.replace(tmp_path, self.path)
+            self._dirty = False
+
+    def print_stats(self):
+        with self._lock:
+            open_hosts = sorted(host for host, state in self._hosts.items() if state['state'] != CLOSED)
+        print(f"🚦 Circuit breakers: {self.stats['skipped']} fetches skipped, {self.stats['opened']} opened, "
+              f"{self.stats['probes']} half-open probes, {self.stats['closed']} closed"
+              + (f"; open: {', '.join(open_hosts)}" if open_hosts else ""))
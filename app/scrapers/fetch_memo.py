@@ -0,0 +1,61 @@
+import threading
+from collections import Counter
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Hashable
+
+
+class FetchMemo:
+    """Run-scoped memo that shares one response and one parsed document per URL.
+
+    Concurrent callers asking for the same key wait on the first caller's
+    result instead of fetching or parsing again (single flight). Failures are
+    memoized too, so a broken URL is only tried once per run, unless the
+    exception is marked `transient` (e.g. a cancelled fetch).
+    """
+
+    def __init__(self):
+        self._futures: Dict[Hashable, Future] = {}
+        self._lock = threading.Lock()
+        self.loaded = Counter()
+        self.saved = Counter()
+
+    def get_or_load(self, kind: str, url: str, loader: Callable[[], Any]) -> Any:
+        key = (kind, url)
+        with self._lock:
+            future = self._futures.get(key)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._futures[key] = future
+                self.loaded[kind] += 1
+            else:
+                self.saved[(kind, url)] += 1
+
+        if owner:
+            try:
+                future.set_result(loader())
+            except Exception as e:
+                if getattr(e, 'transient', False):
+                    with self._lock:
+                        self._futures.pop(key, None)
+                future.set_exception(e)
+        return future.result()
+
+    def report(self) -> Dict:
+        # A shared parsed document also spares the fetch behind it
+        saved_fetches = sum(self.saved.values())
+        saved_parses = sum(n for (kind, _), n in self.saved.items() if kind.startswith('soup'))
+        return {
+            'fetches': self.loaded['response'],
+            'parses': sum(n for kind, n in self.loaded.items() if kind.startswith('soup')),
+            'saved_fetches': saved_fetches,
+            'saved_parses': saved_parses,
+            'most_shared': [(url, n) for (_, url), n in self.saved.most_common(5)]
+        }
+
+    def print_report(self):
+        report = self.report()
+        print(f"♻️ Fetch memo: {report['fetches']} fetches, {report['saved_fetches']} duplicate fetches saved, "
+              f"{report['parses']} parses, {report['saved_parses']} duplicate parses saved")
+        for url, n in report['most_shared']:
+            print(f"   {url} shared {n}x")
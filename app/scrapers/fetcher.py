@@ -0,0 +1,312 @@
+import asyncio
+import contextvars
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+from urllib.parse import urlparse
+
+import requests
+from bs4 import BeautifulSoup
+
+from app.scrapers.circuit_breaker import CircuitBreakerStore, CircuitOpen
+from app.scrapers.fetch_memo import FetchMemo
+from app.scrapers.http_cache import ResponseCache
+from app.scrapers.http_session import PooledSession
+from app.scrapers.page_archive import PageArchive
+from app.scrapers.parsing import parse_html
+from app.scrapers.rate_limiter import HostRateLimiter
+
+
+class FetchDeadlineExceeded(Exception):
+    """Raised when a fetch is attempted after the run-wide deadline"""
+
+
+class FetchCancelled(Exception):
+    """Raised when a fetch is attempted after its stream stopped consuming results"""
+    # Not a property of the URL, so the run memo must not remember it
+    transient = True
+
+
+# Set by `stream_jobs` for the jobs it runs; copied into the fetch threads they use
+_cancel_event: contextvars.ContextVar[Optional[threading.Event]] = contextvars.ContextVar(
+    'fetch_cancel_event', default=None
+)
+
+
+def run_sync(coro):
+    """Run a coroutine to completion from synchronous code.
+
+    Falls back to a helper thread when called from inside a running event loop
+    (e.g. the FastAPI `/discover` handler), where `asyncio.run` is not allowed.
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        return pool.submit(contextvars.copy_context().run, asyncio.run, coro).result()
+
+
+class AsyncFetcher:
+    """Asyncio fetch layer shared by all scrapers.
+
+    Blocking HTTP calls run on a thread pool so every planned URL can be in
+    flight at the same time. A semaphore per host caps concurrency towards
+    each site and a run-wide deadline stops new fetches once collection has
+    taken too long. Requests go through a pooled keep-alive session so
+    connections are reused across scrapers, and a per-host token bucket keeps
+    each site within its crawl budget. With a `ResponseCache` attached, fresh
+    pages are served from disk and stale ones are revalidated conditionally.
+    With a `CircuitBreakerStore` attached, hosts that keep failing are skipped
+    and timeouts follow each host's observed latency. With a `PageArchive`
+    attached, every page fetched from the network is kept for reprocessing.
+    Inside a `run()` scope every URL is fetched and parsed at most once.
+    `stream_jobs()` yields scraper results as they are parsed and cancels the
+    jobs' outstanding fetches when the consumer stops early.
+    """
+
+    def __init__(self, session: Optional[PooledSession] = None, cache: Optional[ResponseCache] = None,
+                 per_host_limit: int = 4, max_workers: int = 16, deadline: float = 90.0,
+                 breakers: Optional[CircuitBreakerStore] = None, archive: Optional[PageArchive] = None):
+        self.session = session or PooledSession(pool_maxsize=per_host_limit)
+        self.cache = cache
+        self.breakers = breakers
+        self.archive = archive
+        # Record/replay bundle (see `app.replay.FixtureBundle`), attached by the runner
+        self.fixtures = None
+        self.rate_limiter = HostRateLimiter()
+        self.per_host_limit = per_host_limit
+        self.deadline = deadline
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='fetch')
+        # Scraper jobs get their own pool so they never starve the fetches they wait on
+        self._job_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix='scrape')
+        self._host_slots: Dict[str, threading.BoundedSemaphore] = {}
+        self._lock = threading.Lock()
+        self._deadline_at: Optional[float] = None
+        self._run_depth = 0
+        self.memo: Optional[FetchMemo] = None
+
+    @contextmanager
+    def run(self, deadline: Optional[float] = None):
+        """Scope a crawl run: arms the global deadline and a fresh fetch memo.
+
+        Nested scopes join the outer run; the memo report is printed when the
+        outermost scope exits.
+        """
+        with self._lock:
+            if self._run_depth == 0:
+                self._deadline_at = time.monotonic() + (deadline if deadline is not None else self.deadline)
+                self.memo = FetchMemo()
+            self._run_depth += 1
+        try:
+            yield self.memo
+        finally:
+            with self._lock:
+                self._run_depth -= 1
+                finished = self._run_depth == 0
+                memo = self.memo
+                if finished:
+                    self._deadline_at = None
+                    self.memo = None
+            if finished:
+                memo.print_report()
+                if self.breakers:
+                    self.breakers.save()
+
+    def remaining(self) -> Optional[float]:
+        """Seconds left before the run deadline, or None if no run is active"""
+        if self._deadline_at is None:
+            return None
+        return self._deadline_at - time.monotonic()
+
+    def _host_slot(self, url: str) -> threading.BoundedSemaphore:
+        host = urlparse(url).netloc
+        with self._lock:
+            slot = self._host_slots.get(host)
+            if slot is None:
+                slot = threading.BoundedSemaphore(self.per_host_limit)
+                self._host_slots[host] = slot
+            return slot
+
+    def _check_cancelled(self, url: str):
+        cancelled = _cancel_event.get()
+        if cancelled is not None and cancelled.is_set():
+            raise FetchCancelled(url)
+
+    def fetch(self, url: str, headers: Optional[Dict] = None, timeout: float = 15) -> requests.Response:
+        """Blocking GET that honours the run memo, the cache, the per-host cap and the run deadline"""
+        self._check_cancelled(url)
+        memo = self.memo
+        if memo is not None:
+            return memo.get_or_load('response', url, lambda: self._fetch(url, headers, timeout))
+        return self._fetch(url, headers, timeout)
+
+    def fetch_soup(self, url: str, headers: Optional[Dict] = None, timeout: float = 15,
+                   only: Optional[str] = None) -> BeautifulSoup:
+        """Fetch and parse a page (optionally only a named subtree, see `parsing.STRAINERS`).
+
+        Within a run all callers share one parsed document per URL and subtree.
+        """
+        def load():
+            response = self.fetch(url, headers, timeout)
+            response.raise_for_status()
+            return parse_html(response.content, only=only)
+
+        self._check_cancelled(url)
+        memo = self.memo
+        if memo is not None:
+            return memo.get_or_load(f"soup:{only or 'page'}", url, load)
+        return load()
+
+    def _fetch(self, url: str, headers: Optional[Dict], timeout: float) -> requests.Response:
+        fixtures = self.fixtures
+        if fixtures is None:
+            return self._fetch_live(url, headers, timeout)
+        if fixtures.replaying:
+            return fixtures.replay_http(url)
+        try:
+            response = self._fetch_live(url, headers, timeout)
+        except requests.RequestException as e:
+            fixtures.record_http(url, error=e)
+            raise
+        fixtures.record_http(url, response)
+        return response
+
+    def _fetch_live(self, url: str, headers: Optional[Dict], timeout: float) -> requests.Response:
+        entry = self.cache.lookup(url) if self.cache else None
+        if entry is not None:
+            fresh = self.cache.serve_fresh(entry)
+            if fresh is not None:
+                return fresh
+            headers = {**(headers or {}), **entry.validators()}
+
+        if self.breakers:
+            if not self.breakers.allow(url):
+                raise CircuitOpen(urlparse(url).netloc)
+            timeout = self.breakers.timeout_for(url, timeout)
+
+        remaining = self.remaining()
+        if remaining is not None:
+            if remaining <= 0:
+                raise FetchDeadlineExceeded(url)
+            timeout = min(timeout, remaining)
+
+        slot = self._host_slot(url)
+        if not slot.acquire(timeout=remaining):
+            raise FetchDeadlineExceeded(url)
+        try:
+            if not self.rate_limiter.acquire(url, timeout=self.remaining()):
+                raise FetchDeadlineExceeded(url)
+            # The stream may have been closed while this fetch was queued
+            self._check_cancelled(url)
+            started = time.monotonic()
+            try:
+                response = self.session.get(url, headers=headers, timeout=timeout)
+            except requests.RequestException:
+                if self.breakers:
+                    self.breakers.record_failure(url)
+                raise
+        finally:
+            slot.release()
+
+        if self.breakers:
+            if response.status_code == 429 or response.status_code >= 500:
+                self.breakers.record_failure(url)
+            else:
+                self.breakers.record_success(url, time.monotonic() - started)
+
+        if self.cache:
+            response = self.cache.update(url, response, entry)
+        if self.archive:
+            self.archive.store(url, response)
+        return response
+
+    async def fetch_async(self, url: str, headers: Optional[Dict] = None, timeout: float = 15) -> requests.Response:
+        loop = asyncio.get_running_loop()
+        context = contextvars.copy_context()
+        return await loop.run_in_executor(self._executor, context.run, self.fetch, url, headers, timeout)
+
+    async def fetch_many_async(self, urls: List[str], headers: Optional[Dict] = None,
+                               timeout: float = 15) -> Dict[str, Optional[requests.Response]]:
+        results = await asyncio.gather(
+            *[self.fetch_async(url, headers, timeout) for url in urls],
+            return_exceptions=True
+        )
+        responses = {}
+        for url, result in zip(urls, results):
+            if isinstance(result, Exception):
+                if not isinstance(result, (FetchCancelled, CircuitOpen)):
+                    print(f"Error fetching {url}: {result}")
+                responses[url] = None
+            else:
+                responses[url] = result
+        return responses
+
+    def fetch_many(self, urls: List[str], headers: Optional[Dict] = None,
+                   timeout: float = 15) -> Dict[str, Optional[requests.Response]]:
+        """Fetch all URLs concurrently; failed URLs map to None"""
+        return run_sync(self.fetch_many_async(urls, headers, timeout))
+
+    def stream_jobs(self, jobs: Dict[str, Callable[[], Iterable]],
+                    ordered: bool = False) -> Iterator[Tuple[str, Any]]:
+        """Run generator-returning scraper jobs side by side and yield `(name, item)` as items arrive.
+
+        Stops at the run deadline. Closing the stream early cancels every fetch
+        the jobs have not started yet; requests already on the wire finish.
+        With `ordered`, the jobs still run side by side but their items are
+        yielded job by job in `jobs` order, so a consumer that stops early
+        stops at the same item on every run (record/replay).
+        """
+        items: queue.Queue = queue.Queue()
+        finished = object()
+        cancelled = threading.Event()
+
+        def pump(name: str, job: Callable[[], Iterable]):
+            _cancel_event.set(cancelled)
+            try:
+                for item in job():
+                    if cancelled.is_set():
+                        break
+                    items.put((name, item))
+            except FetchCancelled:
+                pass
+            except Exception as e:
+                print(f"❌ {name} failed: {e}")
+            finally:
+                items.put((name, finished))
+
+        for name, job in jobs.items():
+            self._job_executor.submit(contextvars.copy_context().run, pump, name, job)
+
+        active = set(jobs)
+        order = list(jobs)
+        held: Dict[str, List] = {name: [] for name in order}
+        try:
+            while active:
+                remaining = self.remaining()
+                try:
+                    name, item = items.get(timeout=max(remaining, 0) if remaining is not None else None)
+                except queue.Empty:
+                    for name in sorted(active):
+                        print(f"⏱️ {name} did not finish before the fetch deadline")
+                    return
+                if item is finished:
+                    active.discard(name)
+                elif not ordered:
+                    yield name, item
+                else:
+                    held[name].append(item)
+                # Release the leading job's items, moving on once it has finished
+                while ordered and order:
+                    leading = order[0]
+                    for item in held[leading]:
+                        yield leading, item
+                    held[leading] = []
+                    if leading in active:
+                        break
+                    order.pop(0)
+        finally:
+            cancelled.set()
\ No newline at end of file
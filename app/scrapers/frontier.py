@@ -0,0 +1,95 @@
+import hashlib
+import math
+import os
+import struct
+import threading
+from typing import Optional, Set
+
+from app.storage import cache_path
+
+_HEADER = struct.Struct('<QII')  # bit count, hash count, items added
+
+
+class SeenFrontier:
+    """Persistent set of item keys seen on earlier runs, stored as a Bloom filter.
+
+    Scrapers check `is_seen()` before doing per-item work; the agent `mark()`s
+    the items it actually consumes. Marks are staged until `commit()`, so a run that fails
+    before publishing does not hide its candidates from the next run. The
+    filter is sized for `capacity` items at `error_rate` false positives
+    (~180 KB for the defaults) and starts over once it is full.
+    """
+
+    def __init__(self, path: Optional[str] = None, capacity: int = 100_000, error_rate: float = 0.001):
+        self.path = path or cache_path('seen_frontier.bloom')
+        self.capacity = capacity
+        self.num_bits = int(math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        self.stats = {'new': 0, 'skipped': 0}
+        self._lock = threading.Lock()
+        self._pending: Set[str] = set()
+        self._count = 0
+        self._bits = bytearray((self.num_bits + 7) // 8)
+        self._load()
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'rb') as f:
+                num_bits, num_hashes, count = _HEADER.unpack(f.read(_HEADER.size))
+                bits = f.read()
+        except (OSError, struct.error) as e:
+            print(f"Ignoring unreadable frontier {self.path}: {e}")
+            return
+        if num_bits != self.num_bits or num_hashes != self.num_hashes or len(bits) != len(self._bits):
+            print("Frontier size changed; starting a fresh seen set")
+            return
+        self._bits = bytearray(bits)
+        self._count = count
+
+    def _positions(self, key: str):
+        digest = hashlib.sha256(key.encode('utf-8')).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:16], 'little') | 1
+        for i in range(self.num_hashes):
+            yield (h1 + i * h2) % self.num_bits
+
+    def _contains(self, key: str) -> bool:
+        return all(self._bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(key))
+
+    def is_seen(self, key: str) -> bool:
+        """True if the item was reported on an earlier (committed) run"""
+        with self._lock:
+            seen = self._contains(key)
+            self.stats['skipped' if seen else 'new'] += 1
+            return seen
+
+    def mark(self, key: str):
+        """Stage an item as seen; it becomes visible to later runs on commit"""
+        with self._lock:
+            self._pending.add(key)
+
+    def commit(self):
+        with self._lock:
+            if not self._pending:
+                return
+            if self._count + len(self._pending) > self.capacity:
+                print("Frontier is full; starting a fresh seen set")
+                self._bits = bytearray(len(self._bits))
+                self._count = 0
+            for key in self._pending:
+                if not self._contains(key):
+                    for pos in self._positions(key):
+                        self._bits[pos >> 3] |= 1 << (pos & 7)
+                    self._count += 1
+            self._pending.clear()
+
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(_HEADER.pack(self.num_bits, self.num_hashes, self._count))
+                f.write(self._bits)
+            os.replace(tmp_path, self.path)
+
+    def print_stats(self):
+        print(f"🧮 Frontier: {self.stats['new']} new items, {self.stats['skipped']} already-seen items skipped")
@@ -1,28 +1,59 @@
-import requests
-from bs4 import BeautifulSoup
-import time
-import random
-from typing import List, Dict, Optional
+from typing import Iterator, List, Dict, Optional
 from datetime import datetime
+import html
+import json
+import os
 import re
+from urllib.parse import urlparse
+
+from app.scrapers.fetcher import AsyncFetcher
+from app.scrapers.frontier import SeenFrontier
+from app.scrapers.parsing import parse_html
+
+HN_API_BASE_URL = "https://hacker-news.firebaseio.com/v0"
+_TAG = re.compile(r'<[^>]+>')
 
 class HackerNewsScraper:
-    def __init__(self):
+    def __init__(self, fetcher: Optional[AsyncFetcher] = None,
+                 requests_per_second: float = 2.0, burst: int = 3,
+                 frontier: Optional[SeenFrontier] = None,
+                 mode: Optional[str] = None, api_base_url: Optional[str] = None,
+                 api_requests_per_second: float = 20.0, api_batch_size: int = 10):
+        self.fetcher = fetcher or AsyncFetcher()
+        # Items reported on earlier runs are skipped when a frontier is attached
+        self.frontier = frontier
         self.base_url = "https://news.ycombinator.com"
+        # 'api' reads the official JSON endpoints; 'html' crawls the site
+        self.mode = mode or os.getenv("HN_MODE", "api")
+        self.api_base_url = (api_base_url or os.getenv("HN_API_BASE_URL", HN_API_BASE_URL)).rstrip('/')
+        self.api_batch_size = api_batch_size
+        # Crawl budget for this site; only outbound requests are throttled
+        self.fetcher.rate_limiter.configure(self.base_url, rate=requests_per_second, burst=burst)
+        self.fetcher.rate_limiter.configure(self.api_base_url, rate=api_requests_per_second,
+                                            burst=int(api_requests_per_second))
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
         }
         
     def get_startup_ideas(self, limit: int = 30) -> List[Dict]:
         """Get startup-related stories from Hacker News by crawling"""
-        ideas = []
+        return list(self.iter_startup_ideas(limit))
+    
+    def iter_startup_ideas(self, limit: int = 30) -> Iterator[Dict]:
+        """Yield startup-related stories as soon as each row is parsed"""
+        if self.mode == 'api':
+            try:
+                for idea in self._iter_api_stories('topstories', limit):
+                    if self._is_startup_related(idea):
+                        yield idea
+                yield from self._iter_api_stories('showstories', limit // 2, 'hackernews_showhn')
+            except Exception as e:
+                print(f"Error reading Hacker News API: {e}")
+            return
         
         try:
             # Get the main page
-            response = requests.get(self.base_url, headers=self.headers, timeout=10)
-            response.raise_for_status()
-            
-            soup = BeautifulSoup(response.content, 'html.parser')
+            soup = self.fetcher.fetch_soup(self.base_url, headers=self.headers, timeout=10, only='hn_rows')
             
             # Find story rows (Hacker News uses specific structure)
             story_rows = soup.find_all('tr', class_='athing')
@@ -30,28 +61,52 @@ class HackerNewsScraper:
             for row in story_rows[:limit]:
                 try:
                     idea = self._extract_idea_from_row(row)
-                    if idea and self._is_startup_related(idea):
-                        ideas.append(idea)
-                        
-                    # Rate limiting
-                    time.sleep(random.uniform(0.1, 0.3))
-                    
                 except Exception as e:
                     print(f"Error extracting idea from row: {e}")
                     continue
+                if idea and self._is_startup_related(idea):
+                    yield idea
             
             # Also get Show HN posts
-            show_hn_ideas = self.get_show_hn_posts(limit // 2)
-            ideas.extend(show_hn_ideas)
+            yield from self.iter_show_hn_posts(limit // 2)
             
         except Exception as e:
             print(f"Error scraping Hacker News: {e}")
+    
+    def parse_page(self, url: str, content: bytes) -> List[Dict]:
+        """Extract stories from a stored API item or listing page (see `PageArchive`)"""
+        if url.startswith(self.api_base_url):
+            # Listings only hold IDs; the stories are in the archived items
+            if '/item/' not in url:
+                return []
+            item = json.loads(content)
+            is_show_hn = (item or {}).get('title', '').startswith('Show HN')
+            idea = self._idea_from_item(item, 'hackernews_showhn' if is_show_hn else 'hackernews')
+            return [idea] if idea else []
         
+        is_show_hn = urlparse(url).path.rstrip('/') == '/show'
+        soup = parse_html(content, only='hn_rows')
+        ideas = []
+        for row in soup.find_all('tr', class_='athing'):
+            idea = self._extract_idea_from_row(row)
+            if not idea:
+                continue
+            if is_show_hn:
+                idea['source_type'] = 'hackernews_showhn'
+                ideas.append(idea)
+            elif self._is_startup_related(idea):
+                ideas.append(idea)
         return ideas
     
     def _extract_idea_from_row(self, row) -> Optional[Dict]:
         """Extract idea information from a Hacker News story row"""
         try:
+            # Get story ID for detailed view; stories seen on earlier runs are skipped
+            story_id = row.get('id', '')
+            item_key = f"hn:{story_id}" if story_id else None
+            if self.frontier and item_key and self.frontier.is_seen(item_key):
+                return None
+            
             # Find the title link
             title_elem = row.find('a', class_='storylink')
             if not title_elem:
@@ -83,9 +138,6 @@ class HackerNewsScraper:
                 if comments_match:
                     comments_count = int(comments_match.group(1))
             
-            # Get story ID for detailed view
-            story_id = row.get('id', '')
-            
             return {
                 'title': title,
                 'content': '',  # Will be filled by get_idea_details if needed
@@ -94,7 +146,9 @@ class HackerNewsScraper:
                 'comments_count': comments_count,
                 'created_utc': datetime.now().timestamp(),
                 'story_id': story_id,
-                'source_type': 'hackernews'
+                'source_type': 'hackernews',
+                # The agent marks it seen once it has consumed the story
+                'item_key': item_key
             }
             
         except Exception as e:
@@ -104,35 +158,108 @@ class HackerNewsScraper:
     
     def get_show_hn_posts(self, limit: int = 15) -> List[Dict]:
         """Get 'Show HN' posts which are often startup launches"""
-        ideas = []
+        return list(self.iter_show_hn_posts(limit))
+    
+    def iter_show_hn_posts(self, limit: int = 15) -> Iterator[Dict]:
+        """Yield 'Show HN' posts as soon as each row is parsed"""
+        if self.mode == 'api':
+            try:
+                yield from self._iter_api_stories('showstories', limit, 'hackernews_showhn')
+            except Exception as e:
+                print(f"Error reading Show HN from API: {e}")
+            return
         
         try:
             # Get Show HN page
             show_hn_url = f"{self.base_url}/show"
-            response = requests.get(show_hn_url, headers=self.headers, timeout=10)
-            response.raise_for_status()
-            
-            soup = BeautifulSoup(response.content, 'html.parser')
+            soup = self.fetcher.fetch_soup(show_hn_url, headers=self.headers, timeout=10, only='hn_rows')
             story_rows = soup.find_all('tr', class_='athing')
             
             for row in story_rows[:limit]:
                 try:
                     idea = self._extract_idea_from_row(row)
-                    if idea:
-                        idea['source_type'] = 'hackernews_showhn'
-                        ideas.append(idea)
-                        
-                    time.sleep(random.uniform(0.1, 0.3))
-                    
                 except Exception as e:
                     print(f"Error extracting Show HN idea: {e}")
                     continue
+                if idea:
+                    idea['source_type'] = 'hackernews_showhn'
+                    yield idea
                     
         except Exception as e:
             print(f"Error scraping Show HN: {e}")
+    
+    def get_new_stories(self, limit: int = 30) -> List[Dict]:
+        """Get the newest startup-related stories"""
+        if self.mode == 'api':
+            try:
+                return [idea for idea in self._iter_api_stories('newstories', limit)
+                        if self._is_startup_related(idea)]
+            except Exception as e:
+                print(f"Error reading new stories from API: {e}")
+                return []
         
+        ideas = []
+        try:
+            soup = self.fetcher.fetch_soup(f"{self.base_url}/newest", headers=self.headers,
+                                           timeout=10, only='hn_rows')
+            for row in soup.find_all('tr', class_='athing')[:limit]:
+                idea = self._extract_idea_from_row(row)
+                if idea and self._is_startup_related(idea):
+                    ideas.append(idea)
+        except Exception as e:
+            print(f"Error scraping new stories: {e}")
         return ideas
     
+    def _iter_api_stories(self, listing: str, limit: int, source_type: str = 'hackernews') -> Iterator[Dict]:
+        """Yield stories from a JSON listing (topstories, showstories, newstories).
+        
+        Item IDs already in the frontier are dropped before any item is fetched;
+        the rest are fetched concurrently in batches, in listing order.
+        """
+        response = self.fetcher.fetch(f"{self.api_base_url}/{listing}.json", timeout=10)
+        response.raise_for_status()
+        
+        story_ids = []
+        for story_id in response.json()[:limit]:
+            if self.frontier and self.frontier.is_seen(f"hn:{story_id}"):
+                continue
+            story_ids.append(story_id)
+        
+        for start in range(0, len(story_ids), self.api_batch_size):
+            batch = story_ids[start:start + self.api_batch_size]
+            item_urls = [f"{self.api_base_url}/item/{story_id}.json" for story_id in batch]
+            responses = self.fetcher.fetch_many(item_urls, timeout=10)
+            for item_url in item_urls:
+                item_response = responses[item_url]
+                if item_response is None or item_response.status_code != 200:
+                    continue
+                idea = self._idea_from_item(item_response.json(), source_type)
+                if idea:
+                    yield idea
+    
+    def _idea_from_item(self, item: Optional[Dict], source_type: str) -> Optional[Dict]:
+        """Map an API item to an idea; deleted, dead and non-story items are skipped"""
+        if not item or item.get('deleted') or item.get('dead') or item.get('type') != 'story':
+            return None
+        title = item.get('title', '').strip()
+        if not title:
+            return None
+        
+        story_id = str(item['id'])
+        text = html.unescape(_TAG.sub(' ', item.get('text', ''))).strip()
+        return {
+            'title': title,
+            'content': re.sub(r'\s+', ' ', text),
+            # Ask/Show HN posts without an external link point at their discussion
+            'url': item.get('url') or f"{self.base_url}/item?id={story_id}",
+            'score': item.get('score', 0),
+            'comments_count': item.get('descendants', 0),
+            'created_utc': item.get('time') or datetime.now().timestamp(),
+            'story_id': story_id,
+            'source_type': source_type,
+            'item_key': f"hn:{story_id}"
+        }
+    
     def _is_startup_related(self, idea: Dict) -> bool:
         """Check if story is startup-related"""
         title = idea.get('title', '').lower()
@@ -152,11 +279,19 @@ class HackerNewsScraper:
     
     def get_idea_details(self, url: str) -> Optional[Dict]:
         """Get detailed information about a specific idea"""
+        item_prefix = f"{self.base_url}/item?id="
+        if self.mode == 'api' and url.startswith(item_prefix):
+            # Text posts: the item itself carries the content
+            try:
+                response = self.fetcher.fetch(f"{self.api_base_url}/item/{url[len(item_prefix):]}.json", timeout=10)
+                response.raise_for_status()
+                return self._idea_from_item(response.json(), 'hackernews')
+            except Exception as e:
+                print(f"Error getting item details from {url}: {e}")
+                return None
+        
         try:
-            response = requests.get(url, headers=self.headers, timeout=10)
-            response.raise_for_status()
-            
-            soup = BeautifulSoup(response.content, 'html.parser')
+            soup = self.fetcher.fetch_soup(url, headers=self.headers, timeout=10)
             
             # Extract title
             title_elem = soup.find(['h1', 'h2', 'h3', 'title'])
@@ -196,12 +331,17 @@ class HackerNewsScraper:
         """Get trending stories from Hacker News"""
         ideas = []
         
+        if self.mode == 'api':
+            try:
+                return [idea for idea in self._iter_api_stories('topstories', limit)
+                        if self._is_startup_related(idea)]
+            except Exception as e:
+                print(f"Error reading trending stories from API: {e}")
+                return ideas
+        
         try:
             # Get the main page (already sorted by popularity)
-            response = requests.get(self.base_url, headers=self.headers, timeout=10)
-            response.raise_for_status()
-            
-            soup = BeautifulSoup(response.content, 'html.parser')
+            soup = self.fetcher.fetch_soup(self.base_url, headers=self.headers, timeout=10, only='hn_rows')
             story_rows = soup.find_all('tr', class_='athing')
             
             for row in story_rows[:limit]:
@@ -210,8 +350,6 @@ class HackerNewsScraper:
                     if idea and self._is_startup_related(idea):
                         ideas.append(idea)
                         
-                    time.sleep(random.uniform(0.1, 0.3))
-                    
                 except Exception as e:
                     print(f"Error extracting trending story: {e}")
                     continue
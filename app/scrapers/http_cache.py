@@ -0,0 +1,139 @@
+import json
+import sqlite3
+import threading
+import time
+from typing import Dict, NamedTuple, Optional
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from app.storage import cache_path
+
+# Headers that describe the wire encoding rather than the (already decoded) body we store
+_DROPPED_HEADERS = {'content-encoding', 'content-length', 'transfer-encoding', 'connection'}
+
+
+def build_response(url: str, status_code: int, headers: Dict, body: bytes) -> requests.Response:
+    """Create a `requests.Response` from stored parts so scrapers can't tell it from a live one"""
+    response = requests.Response()
+    response.url = url
+    response.status_code = status_code
+    response.headers = CaseInsensitiveDict(headers)
+    response._content = body
+    response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+    return response
+
+
+class CachedEntry(NamedTuple):
+    response: requests.Response
+    etag: Optional[str]
+    last_modified: Optional[str]
+    stored_at: float
+
+    def validators(self) -> Dict[str, str]:
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+
+class ResponseCache:
+    """On-disk HTTP response cache with conditional revalidation.
+
+    Entries younger than `ttl` are served without touching the network. Older
+    entries are revalidated with `If-None-Match` / `If-Modified-Since`; a 304
+    answer refreshes the entry and the stored body is served. The total body
+    size is kept under `max_bytes` by evicting least recently used entries,
+    and entries older than `max_stale` are dropped entirely.
+    """
+
+    def __init__(self, path: Optional[str] = None, ttl: float = 600,
+                 max_bytes: int = 50 * 1024 * 1024, max_stale: float = 7 * 24 * 3600):
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.max_stale = max_stale
+        self.stats = {'fresh_hits': 0, 'revalidated': 0, 'misses': 0, 'stored': 0}
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path or cache_path('http_cache.sqlite3'), check_same_thread=False)
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                url TEXT PRIMARY KEY,
+                status INTEGER NOT NULL,
+                headers TEXT NOT NULL,
+                body BLOB NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                stored_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )
+        """)
+        self._db.commit()
+
+    def lookup(self, url: str) -> Optional[CachedEntry]:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT status, headers, body, etag, last_modified, stored_at FROM responses WHERE url = ?",
+                (url,)
+            ).fetchone()
+            if row is None:
+                return None
+            self._db.execute("UPDATE responses SET last_access = ? WHERE url = ?", (time.time(), url))
+            self._db.commit()
+        status, headers, body, etag, last_modified, stored_at = row
+        return CachedEntry(build_response(url, status, json.loads(headers), body), etag, last_modified, stored_at)
+
+    def serve_fresh(self, entry: Optional[CachedEntry]) -> Optional[requests.Response]:
+        """Return the cached response if it is still within its TTL"""
+        if entry is not None and time.time() - entry.stored_at < self.ttl:
+            self.stats['fresh_hits'] += 1
+            return entry.response
+        return None
+
+    def update(self, url: str, response: requests.Response,
+               entry: Optional[CachedEntry] = None) -> requests.Response:
+        """Fold a live response into the cache and return what the caller should use"""
+        if response.status_code == 304 and entry is not None:
+            with self._lock:
+                self._db.execute("UPDATE responses SET stored_at = ? WHERE url = ?", (time.time(), url))
+                self._db.commit()
+            self.stats['revalidated'] += 1
+            return entry.response
+
+        self.stats['misses'] += 1
+        cache_control = response.headers.get('Cache-Control', '').lower()
+        if response.status_code != 200 or 'no-store' in cache_control:
+            return response
+
+        headers = {k: v for k, v in response.headers.items() if k.lower() not in _DROPPED_HEADERS}
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (url, response.status_code, json.dumps(headers), response.content,
+                 response.headers.get('ETag'), response.headers.get('Last-Modified'), now, now)
+            )
+            self._db.commit()
+        self.stats['stored'] += 1
+        self._evict()
+        return response
+
+    def _evict(self):
+        with self._lock:
+            self._db.execute("DELETE FROM responses WHERE stored_at < ?", (time.time() - self.max_stale,))
+            total = self._db.execute("SELECT COALESCE(SUM(LENGTH(body)), 0) FROM responses").fetchone()[0]
+            if total > self.max_bytes:
+                rows = self._db.execute(
+                    "SELECT url, LENGTH(body) FROM responses ORDER BY last_access ASC"
+                ).fetchall()
+                for url, size in rows:
+                    if total <= self.max_bytes:
+                        break
+                    self._db.execute("DELETE FROM responses WHERE url = ?", (url,))
+                    total -= size
+            self._db.commit()
+
+    def print_stats(self):
+        print(f"🗄️ HTTP cache: {self.stats['fresh_hits']} fresh hits, {self.stats['revalidated']} revalidated (304), "
+              f"{self.stats['misses']} fetched, {self.stats['stored']} stored")
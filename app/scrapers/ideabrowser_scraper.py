@@ -1,123 +1,136 @@
-import requests
-from bs4 import BeautifulSoup
-import time
-import random
-from typing import List, Dict, Optional
+from typing import Iterator, List, Dict, Optional
 from datetime import datetime
+from urllib.parse import urlparse
 import re
 
-class IdeaBrowserScraper:
-    def __init__(self):
-        self.base_url = "https://www.ideabrowser.com"
-        self.headers = {
-            'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,image/apng,*/*;q=0.8',
-            'Accept-Language': 'ko-KR,ko;q=0.9,en;q=0.8',
-            'Accept-Encoding': 'gzip, deflate, br',
-            'Connection': 'keep-alive',
-            'Upgrade-Insecure-Requests': '1',
-            'Sec-Fetch-Dest': 'document',
-            'Sec-Fetch-Mode': 'navigate',
-            'Sec-Fetch-Site': 'none',
-            'Cache-Control': 'max-age=0',
-        }
+from app.scrapers.fetcher import AsyncFetcher
+from app.scrapers.frontier import SeenFrontier
+from app.scrapers.negative_cache import DeadUrlStore
+from app.scrapers.listing_parser import ListingParser, extract_page
+from app.scrapers.parse_pool import ParsePool
+from app.scrapers.parsing import parse_html
+from app.scrapers.selector_plans import SelectorPlanStore
 
-    def get_startup_ideas(self, limit: int = 50) -> List[Dict]:
-        """Get startup ideas from ideabrowser.com"""
+# Selector cascades probed when no learned plan matches
+CONTAINER_SELECTORS = ['article', '.idea-card', '.card', '.post', '.item',
+                       '[class*="idea"]', '[class*="card"]', '[class*="post"]']
+LISTING_CONTAINER_SELECTORS = ['article', '.idea-card', '.card', '.post', '.item']
+TITLE_SELECTORS = ['h1', 'h2', 'h3', 'h4', 'h5', 'h6', '.title', '.heading', '[class*="title"]']
+CONTENT_SELECTORS = ['p', '.content', '.description', '.summary', '[class*="content"]', '[class*="desc"]']
+DATE_SELECTORS = ['time', '.date', '.published', '[class*="date"]']
+CATEGORY_SELECTORS = ['.category', '.tag', '.label', '[class*="category"]', '[class*="tag"]']
+DETAIL_TITLE_SELECTORS = ['h1', 'h2', 'h3', '.title', '.heading']
+DETAIL_CONTENT_SELECTORS = ['article', 'main', '.content', '.post-content', '.entry-content',
+                            '.idea-content', '.description', '.summary', '.details']
+DETAIL_CATEGORY_SELECTORS = ['.category', '.tag', '.label', '[class*="category"]']
+
+class IdeaBrowserParser(ListingParser):
+    """Extracts ideas from IdeaBrowser pages using learned selector plans; fetches nothing"""
+
+    def __init__(self, selector_plans: Optional[SelectorPlanStore] = None,
+                 frontier: Optional[SeenFrontier] = None,
+                 parse_pool: Optional[ParsePool] = None):
+        super().__init__("https://www.ideabrowser.com", frontier=frontier, parse_pool=parse_pool)
+        self.selector_plans = selector_plans or SelectorPlanStore()
+
+    @classmethod
+    def for_worker(cls) -> 'IdeaBrowserParser':
+        # Plans live in memory; the parent's plan is loaded for every page
+        return IdeaBrowserParser(selector_plans=SelectorPlanStore(path=':memory:'))
+
+    def _parse_in_worker(self, url: str, content: bytes, limit: Optional[int]) -> List[Dict]:
+        # The worker gets the current plan for the page type; its changes are merged back here
+        page_key = self._page_key(url)
+        ideas, plan, stats = self.parse_pool.run(
+            extract_page, type(self), self.base_url, url, content, limit,
+            page_key, self.selector_plans.plan(page_key)
+        )
+        self.selector_plans.merge(page_key, plan, stats)
+        return ideas
+
+    def parse_page(self, url: str, content: bytes, limit: Optional[int] = None) -> List[Dict]:
+        """Extract ideas from a listing page's raw bytes (live, in a parse worker or from `PageArchive`)"""
+        soup = parse_html(content, only='cards')
+        page_key = self._page_key(url)
+        
+        # Try the learned container selector first, then the full cascade
+        if page_key == 'home':
+            containers = self._find_containers(soup, page_key, CONTAINER_SELECTORS)
+            if not containers:
+                # Fallback: look for any div with text content; the strained tree
+                # holds only cards, so this needs the whole page
+                soup = parse_html(content)
+                containers = soup.find_all('div', string=re.compile(r'idea|startup|business|app|tool|saas', re.I))
+                print(f"Fallback: Found {len(containers)} containers with startup-related text")
+        else:
+            containers = self._find_containers(soup, page_key, LISTING_CONTAINER_SELECTORS)
+        
         ideas = []
-        try:
-            print(f"Scraping {self.base_url}...")
-            response = requests.get(self.base_url, headers=self.headers, timeout=15)
-            response.raise_for_status()
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            # Try multiple selectors for idea containers
-            selectors = [
-                'article',
-                '.idea-card',
-                '.card',
-                '.post',
-                '.item',
-                '[class*="idea"]',
-                '[class*="card"]',
-                '[class*="post"]'
-            ]
-            
-            idea_containers = []
-            for selector in selectors:
-                containers = soup.select(selector)
-                if containers:
-                    idea_containers = containers
-                    print(f"Found {len(containers)} containers using selector: {selector}")
-                    break
-            
-            if not idea_containers:
-                # Fallback: look for any div with text content
-                idea_containers = soup.find_all('div', string=re.compile(r'idea|startup|business|app|tool|saas', re.I))
-                print(f"Fallback: Found {len(idea_containers)} containers with startup-related text")
-            
-            for container in idea_containers[:limit]:
-                try:
-                    idea = self._extract_idea_from_container(container)
-                    if idea and self._is_startup_related(idea):
-                        ideas.append(idea)
-                        print(f"Extracted idea: {idea['title'][:50]}...")
-                    time.sleep(random.uniform(0.5, 1.0))
-                except Exception as e:
-                    print(f"Error extracting idea from container: {e}")
-                    continue
-                    
-        except Exception as e:
-            print(f"Error scraping IdeaBrowser: {e}")
-            
-        print(f"Total ideas extracted: {len(ideas)}")
+        for container in containers[:limit]:
+            idea = self._extract_idea_from_container(container, page_key)
+            if idea and self._is_startup_related(idea):
+                ideas.append(idea)
         return ideas
 
-    def _extract_idea_from_container(self, container) -> Optional[Dict]:
+    def _page_key(self, url: str) -> str:
+        """Page type a URL belongs to; pages of one type share an extraction plan"""
+        path = urlparse(url).path.strip('/')
+        if not path:
+            return 'home'
+        section = path.split('/')[0]
+        if section in ('category', 'tag', 'ideas', 'search'):
+            return section
+        return 'section'
+
+    def _find_containers(self, soup, page_key: str, selectors: List[str]) -> List:
+        known = self.selector_plans.known(page_key, 'container')
+        if known and not soup.select(known):
+            # The page layout changed: relearn every field for this page type
+            self.selector_plans.forget(page_key)
+        return self.selector_plans.resolve(page_key, 'container', selectors, soup.select) or []
+
+    def _select_text(self, element, page_key: str, field: str, selectors: List[str], min_length: int = 0) -> str:
+        """Text of the first selector match for a field, using the learned plan when it still matches"""
+        def match(selector):
+            found = element.select_one(selector)
+            if found:
+                text = found.get_text().strip()
+                if len(text) > min_length:
+                    return text
+            return None
+
+        return self.selector_plans.resolve(page_key, field, selectors, match) or ""
+
+    def _extract_idea_from_container(self, container, page_key: str = 'section') -> Optional[Dict]:
         """Extract idea information from a container element"""
         try:
-            # Try multiple selectors for title
-            title_selectors = ['h1', 'h2', 'h3', 'h4', 'h5', 'h6', '.title', '.heading', '[class*="title"]']
-            title = ""
-            for selector in title_selectors:
-                title_elem = container.select_one(selector)
-                if title_elem:
-                    title = title_elem.get_text().strip()
-                    break
-            
-            # Try multiple selectors for content
-            content_selectors = ['p', '.content', '.description', '.summary', '[class*="content"]', '[class*="desc"]']
-            content = ""
-            for selector in content_selectors:
-                content_elem = container.select_one(selector)
-                if content_elem:
-                    content = content_elem.get_text().strip()
-                    if len(content) > 20:  # Ensure we have meaningful content
-                        break
-            
             # Extract link
             link_elem = container.find('a')
             url = link_elem.get('href', '') if link_elem else ""
             if url and not url.startswith('http'):
                 url = self.base_url + url
             
-            # Extract date
-            date_selectors = ['time', '.date', '.published', '[class*="date"]']
-            date_text = ""
-            for selector in date_selectors:
-                date_elem = container.select_one(selector)
-                if date_elem:
-                    date_text = date_elem.get_text().strip()
-                    break
+            # Ideas seen on earlier runs are skipped before any selector work
+            item_key = f"ib:{url}" if url else None
+            if self.frontier and item_key and self.frontier.is_seen(item_key):
+                return None
+            
+            # Title, content, date and category come from the page type's learned
+            # selectors; the full cascades are only probed when those stop matching
+            title = self._select_text(container, page_key, 'title', TITLE_SELECTORS)
+            
+            content = self._select_text(container, page_key, 'content', CONTENT_SELECTORS, min_length=20)
+            if not content:
+                # No meaningful content anywhere: keep whatever short text exists
+                for selector in CONTENT_SELECTORS:
+                    content_elem = container.select_one(selector)
+                    if content_elem:
+                        content = content_elem.get_text().strip()
+                        break
+            
+            date_text = self._select_text(container, page_key, 'date', DATE_SELECTORS)
             
-            # Extract category/tags
-            category_selectors = ['.category', '.tag', '.label', '[class*="category"]', '[class*="tag"]']
-            category = ""
-            for selector in category_selectors:
-                category_elem = container.select_one(selector)
-                if category_elem:
-                    category = category_elem.get_text().strip()
-                    break
+            category = self._select_text(container, page_key, 'category', CATEGORY_SELECTORS)
             
             if title and content:
                 return {
@@ -128,12 +141,92 @@ class IdeaBrowserScraper:
                     'comments_count': 0,
                     'created_utc': datetime.now().timestamp(),
                     'source_type': 'ideabrowser',
-                    'category': category
+                    'category': category,
+                    # The agent marks it seen once it has consumed the idea
+                    'item_key': item_key
                 }
         except Exception as e:
             print(f"Error extracting idea data: {e}")
         return None
 
+    def _is_startup_related(self, idea: Dict) -> bool:
+        """Check if idea is startup-related"""
+        title = idea.get('title', '').lower()
+        content = idea.get('content', '').lower()
+        category = idea.get('category', '').lower()
+        
+        startup_keywords = [
+            'startup', 'saas', 'app', 'product', 'business', 'entrepreneur',
+            'launch', 'idea', 'project', 'tool', 'service', 'platform',
+            'marketplace', 'api', 'software', 'tech', 'innovation',
+            'funding', 'venture', 'capital', 'accelerator', 'incubator',
+            'side hustle', 'indie', 'bootstrapped', 'mvp', 'prototype',
+            'revenue', 'profit', 'customer', 'user', 'growth', 'scale'
+        ]
+        
+        text_to_check = f"{title} {content} {category}"
+        return any(keyword in text_to_check for keyword in startup_keywords)
+
+
+class IdeaBrowserScraper(IdeaBrowserParser):
+    def __init__(self, fetcher: Optional[AsyncFetcher] = None,
+                 requests_per_second: float = 1.0, burst: int = 2,
+                 selector_plans: Optional[SelectorPlanStore] = None,
+                 dead_urls: Optional[DeadUrlStore] = None,
+                 frontier: Optional[SeenFrontier] = None,
+                 parse_pool: Optional[ParsePool] = None):
+        super().__init__(selector_plans=selector_plans, frontier=frontier, parse_pool=parse_pool)
+        self.fetcher = fetcher or AsyncFetcher()
+        self.dead_urls = dead_urls or DeadUrlStore()
+        # Crawl budget for this site; only outbound requests are throttled
+        self.fetcher.rate_limiter.configure(self.base_url, rate=requests_per_second, burst=burst)
+        self.headers = {
+            'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,image/apng,*/*;q=0.8',
+            'Accept-Language': 'ko-KR,ko;q=0.9,en;q=0.8',
+            'Accept-Encoding': 'gzip, deflate, br',
+            'Connection': 'keep-alive',
+            'Upgrade-Insecure-Requests': '1',
+            'Sec-Fetch-Dest': 'document',
+            'Sec-Fetch-Mode': 'navigate',
+            'Sec-Fetch-Site': 'none',
+            'Cache-Control': 'max-age=0',
+        }
+
+    def get_startup_ideas(self, limit: int = 50) -> List[Dict]:
+        """Get startup ideas from ideabrowser.com"""
+        return list(self.iter_startup_ideas(limit))
+
+    def iter_startup_ideas(self, limit: int = 50) -> Iterator[Dict]:
+        """Yield startup ideas from ideabrowser.com as soon as each page is parsed"""
+        extracted = 0
+        try:
+            print(f"Scraping {self.base_url}...")
+            response = self.fetcher.fetch(self.base_url, headers=self.headers, timeout=15)
+            response.raise_for_status()
+            
+            for idea in self._parse_listing(self.base_url, response.content, limit):
+                extracted += 1
+                print(f"Extracted idea: {idea['title'][:50]}...")
+                yield idea
+                    
+        except Exception as e:
+            print(f"Error scraping IdeaBrowser: {e}")
+        finally:
+            self.selector_plans.save()
+            
+        print(f"Total ideas extracted: {extracted}")
+
+    def _fetch_probes(self, urls: List[str]) -> Dict:
+        """Fetch guessed URL shapes concurrently, skipping ones known to be dead"""
+        live_urls = [url for url in urls if not self.dead_urls.is_dead(url)]
+        responses = self.fetcher.fetch_many(live_urls, headers=self.headers, timeout=15)
+        for url in live_urls:
+            if responses[url] is not None:
+                self.dead_urls.observe(url, responses[url])
+        self.dead_urls.save()
+        return {url: responses.get(url) for url in urls}
+
     def _get_ideas_from_sections(self) -> List[Dict]:
         """Get ideas from different sections of ideabrowser.com"""
         ideas = []
@@ -148,35 +241,31 @@ class IdeaBrowserScraper:
             '/tags'
         ]
         
+        # Fetch every section at once; the fetcher caps concurrency per host
+        section_urls = {section: self.base_url + section for section in sections}
+        responses = self.fetcher.fetch_many(list(section_urls.values()), headers=self.headers, timeout=15)
+        
         for section in sections:
             try:
-                url = self.base_url + section
+                url = section_urls[section]
                 print(f"Scraping section: {url}")
-                response = requests.get(url, headers=self.headers, timeout=15)
+                response = responses[url]
+                if response is None:
+                    continue
                 response.raise_for_status()
-                soup = BeautifulSoup(response.content, 'html.parser')
-                
-                # Try multiple selectors
-                selectors = ['article', '.idea-card', '.card', '.post', '.item']
-                containers = []
-                for selector in selectors:
-                    containers = soup.select(selector)
-                    if containers:
-                        break
-                
-                for container in containers[:10]:
-                    idea = self._extract_idea_from_container(container)
-                    if idea and self._is_startup_related(idea):
-                        ideas.append(idea)
-                    time.sleep(random.uniform(0.1, 0.3))
+                ideas.extend(self._parse_listing(url, response.content, 10))
             except Exception as e:
                 print(f"Error scraping section {section}: {e}")
                 continue
+        self.selector_plans.save()
         return ideas
 
     def get_ideas_by_category(self, category: str, limit: int = 20) -> List[Dict]:
         """Get ideas from a specific category"""
-        ideas = []
+        return list(self.iter_ideas_by_category(category, limit))
+
+    def iter_ideas_by_category(self, category: str, limit: int = 20) -> Iterator[Dict]:
+        """Yield ideas from a specific category as soon as each page is parsed"""
         try:
             category_urls = [
                 f"{self.base_url}/category/{category}",
@@ -184,89 +273,32 @@ class IdeaBrowserScraper:
                 f"{self.base_url}/{category}",
                 f"{self.base_url}/ideas/{category}"
             ]
+            responses = self._fetch_probes(category_urls)
             
             for url in category_urls:
                 try:
                     print(f"Scraping category: {url}")
-                    response = requests.get(url, headers=self.headers, timeout=15)
-                    if response.status_code == 200:
-                        soup = BeautifulSoup(response.content, 'html.parser')
-                        
-                        selectors = ['article', '.idea-card', '.card', '.post', '.item']
-                        containers = []
-                        for selector in selectors:
-                            containers = soup.select(selector)
-                            if containers:
-                                break
-                        
-                        for container in containers[:limit//len(category_urls)]:
-                            idea = self._extract_idea_from_container(container)
-                            if idea and self._is_startup_related(idea):
-                                ideas.append(idea)
-                        time.sleep(random.uniform(1, 2))
+                    response = responses[url]
+                    if response is not None and response.status_code == 200:
+                        yield from self._parse_listing(url, response.content, limit//len(category_urls))
                 except Exception as e:
                     print(f"Error scraping category {category} from {url}: {e}")
                     continue
         except Exception as e:
             print(f"Error getting ideas by category {category}: {e}")
-        return ideas
-
-    def _is_startup_related(self, idea: Dict) -> bool:
-        """Check if idea is startup-related"""
-        title = idea.get('title', '').lower()
-        content = idea.get('content', '').lower()
-        category = idea.get('category', '').lower()
-        
-        startup_keywords = [
-            'startup', 'saas', 'app', 'product', 'business', 'entrepreneur',
-            'launch', 'idea', 'project', 'tool', 'service', 'platform',
-            'marketplace', 'api', 'software', 'tech', 'innovation',
-            'funding', 'venture', 'capital', 'accelerator', 'incubator',
-            'side hustle', 'indie', 'bootstrapped', 'mvp', 'prototype',
-            'revenue', 'profit', 'customer', 'user', 'growth', 'scale'
-        ]
-        
-        text_to_check = f"{title} {content} {category}"
-        return any(keyword in text_to_check for keyword in startup_keywords)
+        finally:
+            self.selector_plans.save()
 
     def get_idea_details(self, url: str) -> Optional[Dict]:
         """Get detailed information about a specific idea"""
         try:
             print(f"Getting details from: {url}")
-            response = requests.get(url, headers=self.headers, timeout=15)
-            response.raise_for_status()
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            # Extract title
-            title_selectors = ['h1', 'h2', 'h3', '.title', '.heading']
-            title = ""
-            for selector in title_selectors:
-                title_elem = soup.select_one(selector)
-                if title_elem:
-                    title = title_elem.get_text().strip()
-                    break
+            soup = self.fetcher.fetch_soup(url, headers=self.headers, timeout=15)
             
-            # Extract content
-            content_selectors = [
-                'article', 'main', '.content', '.post-content', '.entry-content',
-                '.idea-content', '.description', '.summary', '.details'
-            ]
-            content = ""
-            for selector in content_selectors:
-                content_elem = soup.select_one(selector)
-                if content_elem:
-                    content = content_elem.get_text().strip()
-                    if len(content) > 50:
-                        break
-            
-            # Extract category
-            category_selectors = ['.category', '.tag', '.label', '[class*="category"]']
-            category = ""
-            for selector in category_selectors:
-                category_elem = soup.select_one(selector)
-                if category_elem:
-                    category = category_elem.get_text().strip()
-                    break
+            title = self._select_text(soup, 'detail', 'title', DETAIL_TITLE_SELECTORS)
+            content = self._select_text(soup, 'detail', 'content', DETAIL_CONTENT_SELECTORS, min_length=50)
+            category = self._select_text(soup, 'detail', 'category', DETAIL_CATEGORY_SELECTORS)
+            self.selector_plans.save()
             
             if title and content:
                 return {
@@ -292,36 +324,28 @@ class IdeaBrowserScraper:
                 f"{self.base_url}/search/{query}",
                 f"{self.base_url}/ideas/search?q={query}"
             ]
+            responses = self._fetch_probes(search_urls)
             
             for search_url in search_urls:
                 try:
                     print(f"Searching: {search_url}")
-                    response = requests.get(search_url, headers=self.headers, timeout=15)
-                    if response.status_code == 200:
-                        soup = BeautifulSoup(response.content, 'html.parser')
-                        
-                        selectors = ['article', '.idea-card', '.card', '.post', '.item']
-                        containers = []
-                        for selector in selectors:
-                            containers = soup.select(selector)
-                            if containers:
-                                break
-                        
-                        for container in containers[:limit//len(search_urls)]:
-                            idea = self._extract_idea_from_container(container)
-                            if idea and self._is_startup_related(idea):
-                                ideas.append(idea)
-                        time.sleep(random.uniform(1, 2))
+                    response = responses[search_url]
+                    if response is not None and response.status_code == 200:
+                        ideas.extend(self._parse_listing(search_url, response.content, limit//len(search_urls)))
                 except Exception as e:
                     print(f"Error searching ideas from {search_url}: {e}")
                     continue
         except Exception as e:
             print(f"Error searching ideas: {e}")
+        self.selector_plans.save()
         return ideas
 
     def get_trending_ideas(self, limit: int = 20) -> List[Dict]:
         """Get trending ideas"""
-        ideas = []
+        return list(self.iter_trending_ideas(limit))
+
+    def iter_trending_ideas(self, limit: int = 20) -> Iterator[Dict]:
+        """Yield trending ideas as soon as each page is parsed"""
         try:
             trending_urls = [
                 f"{self.base_url}/trending",
@@ -329,29 +353,18 @@ class IdeaBrowserScraper:
                 f"{self.base_url}/hot",
                 f"{self.base_url}/featured"
             ]
+            responses = self._fetch_probes(trending_urls)
             
             for url in trending_urls:
                 try:
                     print(f"Getting trending ideas from: {url}")
-                    response = requests.get(url, headers=self.headers, timeout=15)
-                    if response.status_code == 200:
-                        soup = BeautifulSoup(response.content, 'html.parser')
-                        
-                        selectors = ['article', '.idea-card', '.card', '.post', '.item']
-                        containers = []
-                        for selector in selectors:
-                            containers = soup.select(selector)
-                            if containers:
-                                break
-                        
-                        for container in containers[:limit//len(trending_urls)]:
-                            idea = self._extract_idea_from_container(container)
-                            if idea and self._is_startup_related(idea):
-                                ideas.append(idea)
-                        time.sleep(random.uniform(1, 2))
+                    response = responses[url]
+                    if response is not None and response.status_code == 200:
+                        yield from self._parse_listing(url, response.content, limit//len(trending_urls))
                 except Exception as e:
                     print(f"Error getting trending ideas from {url}: {e}")
                     continue
         except Exception as e:
             print(f"Error getting trending ideas: {e}")
-        return ideas 
\ No newline at end of file
+        finally:
+            self.selector_plans.save() 
@@ -0,0 +1,71 @@
+import abc
+from typing import Dict, List, Optional, Tuple, Type
+
+from app.scrapers.parse_pool import ParsePool
+
+# Parsers living inside a worker process, one per parser class and base URL
+_worker_parsers: Dict[Tuple[type, str], 'ListingParser'] = {}
+
+
+def extract_page(parser_class: Type['ListingParser'], base_url: str, url: str, content: bytes,
+                 limit: Optional[int], page_key: Optional[str] = None, plan: Optional[Dict[str, str]] = None
+                 ) -> Tuple[List[Dict], Optional[Dict[str, str]], Dict[str, int]]:
+    """Parse one page and extract its candidates; runs in a worker process.
+
+    Takes the raw page bytes plus the parent's selector plan for the page type
+    and returns plain candidate dicts, the plan as the worker left it and the
+    worker's selector statistics, so nothing but small records crosses back.
+    """
+    parser = _worker_parsers.get((parser_class, base_url))
+    if parser is None:
+        parser = parser_class.for_worker()
+        parser.base_url = base_url
+        _worker_parsers[(parser_class, base_url)] = parser
+    plans = getattr(parser, 'selector_plans', None)
+    if plans is not None and page_key is not None:
+        plans.load_plan(page_key, plan or {})
+        plans.stats = dict.fromkeys(plans.stats, 0)
+    ideas = parser.parse_page(url, content, limit)
+    if plans is None or page_key is None:
+        return ideas, None, {}
+    return ideas, plans.plan(page_key), plans.stats
+
+
+class ListingParser(abc.ABC):
+    """The extraction half of a listing scraper: page bytes in, candidate records out.
+
+    Holds only what `parse_page` needs, so parse workers build just this (see
+    `for_worker`) and no fetcher, session or stores. `_parse_listing` parses a
+    page inline, or in `parse_pool` when it is large, and then drops the items
+    the attached `frontier` saw on earlier runs, which a worker cannot check.
+    """
+
+    def __init__(self, base_url: str, frontier=None, parse_pool: Optional[ParsePool] = None):
+        self.base_url = base_url
+        # Items reported on earlier runs are skipped when a frontier is attached
+        self.frontier = frontier
+        # Large listing pages are parsed in worker processes when a pool is attached
+        self.parse_pool = parse_pool
+
+    @classmethod
+    @abc.abstractmethod
+    def for_worker(cls) -> 'ListingParser':
+        """Frontier-less parser (not scraper) of this class's source, for use inside a parse worker"""
+
+    @abc.abstractmethod
+    def parse_page(self, url: str, content: bytes, limit: Optional[int] = None) -> List[Dict]:
+        """Extract candidates from a listing page's raw bytes (live, in a parse worker or from `PageArchive`)"""
+
+    def _parse_listing(self, url: str, content: bytes, limit: Optional[int] = None) -> List[Dict]:
+        """`parse_page`, moved to a worker process for large pages"""
+        if not self.parse_pool or not self.parse_pool.offload(content):
+            return self.parse_page(url, content, limit)
+        ideas = self._parse_in_worker(url, content, limit)
+        if not self.frontier:
+            return ideas
+        return [idea for idea in ideas
+                if not idea['item_key'] or not self.frontier.is_seen(idea['item_key'])]
+
+    def _parse_in_worker(self, url: str, content: bytes, limit: Optional[int]) -> List[Dict]:
+        ideas, _, _ = self.parse_pool.run(extract_page, type(self), self.base_url, url, content, limit)
+        return ideas
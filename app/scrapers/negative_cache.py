@@ -0,0 +1,77 @@
+import json
+import os
+import threading
+import time
+from typing import Dict, Optional
+
+import requests
+
+from app.storage import cache_path
+
+DEAD_STATUSES = (404, 410)
+
+
+class DeadUrlStore:
+    """Persistent TTL store of guessed URLs that are known not to exist.
+
+    A guessed URL shape (e.g. `/tag/saas`) is marked dead when it answers
+    404/410 or redirects elsewhere. Dead URLs are skipped until their TTL runs
+    out, and every skip adds the round trip it avoided to the saved-time
+    counter.
+    """
+
+    def __init__(self, path: Optional[str] = None, ttl: float = 3 * 24 * 3600):
+        self.path = path or cache_path('dead_urls.json')
+        self.ttl = ttl
+        self.stats = {'skipped': 0, 'seconds_saved': 0.0, 'marked_dead': 0}
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._entries: Dict[str, Dict] = {}
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, 'r') as f:
+                    self._entries = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"Ignoring unreadable dead URL store {self.path}: {e}")
+
+    def is_dead(self, url: str) -> bool:
+        with self._lock:
+            entry = self._entries.get(url)
+            if entry is None:
+                return False
+            if entry['expires_at'] < time.time():
+                del self._entries[url]
+                self._dirty = True
+                return False
+            self.stats['skipped'] += 1
+            self.stats['seconds_saved'] += entry.get('cost', 0.0)
+            return True
+
+    def observe(self, url: str, response: requests.Response):
+        """Mark a URL dead or alive from the response it produced"""
+        dead = response.status_code in DEAD_STATUSES or bool(response.history)
+        with self._lock:
+            if dead:
+                self._entries[url] = {
+                    'status': response.history[0].status_code if response.history else response.status_code,
+                    'expires_at': time.time() + self.ttl,
+                    'cost': response.elapsed.total_seconds() if response.elapsed else 0.0
+                }
+                self.stats['marked_dead'] += 1
+                self._dirty = True
+            elif response.status_code == 200 and self._entries.pop(url, None) is not None:
+                self._dirty = True
+
+    def save(self):
+        with self._lock:
+            if not self._dirty:
+                return
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump(self._entries, f, indent=2, sort_keys=True)
+            os.replace(tmp_path, self.path)
+            self._dirty = False
+
+    def print_stats(self):
+        print(f"🪦 Dead URL store: {self.stats['skipped']} known-dead URLs skipped "
+              f"(~{self.stats['seconds_saved']:.1f}s saved), {self.stats['marked_dead']} newly marked dead")
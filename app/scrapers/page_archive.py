@@ -0,0 +1,83 @@
+import gzip
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from typing import Iterator, Optional, Tuple
+
+import requests
+
+from app.storage import cache_path
+
+
+class PageArchive:
+    """Content-addressed archive of every page fetched from the network.
+
+    Bodies are stored once per SHA-256 as gzip blobs under `<dir>/ab/<hash>.gz`,
+    so a page that did not change between crawls costs one index row. A small
+    SQLite index records which URL produced which blob and when, which lets
+    `iter_pages()` feed stored pages back through the extractors offline.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or cache_path('archive')
+        os.makedirs(self.path, exist_ok=True)
+        self.stats = {'stored': 0, 'deduplicated': 0}
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(os.path.join(self.path, 'index.sqlite'), check_same_thread=False)
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS fetches (
+                url TEXT NOT NULL,
+                fetched_at REAL NOT NULL,
+                sha256 TEXT NOT NULL,
+                status INTEGER NOT NULL,
+                content_type TEXT
+            )
+        """)
+        self._db.execute("CREATE INDEX IF NOT EXISTS fetches_by_time ON fetches (fetched_at)")
+        self._db.commit()
+
+    def _blob_path(self, digest: str) -> str:
+        return os.path.join(self.path, digest[:2], f"{digest}.gz")
+
+    def store(self, url: str, response: requests.Response):
+        """Archive a successful response body; identical bodies share one blob"""
+        if response.status_code != 200 or not response.content:
+            return
+        digest = hashlib.sha256(response.content).hexdigest()
+        blob_path = self._blob_path(digest)
+        with self._lock:
+            if os.path.exists(blob_path):
+                self.stats['deduplicated'] += 1
+            else:
+                os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+                tmp_path = f"{blob_path}.tmp"
+                with gzip.open(tmp_path, 'wb') as f:
+                    f.write(response.content)
+                os.replace(tmp_path, blob_path)
+                self.stats['stored'] += 1
+            self._db.execute(
+                "INSERT INTO fetches (url, fetched_at, sha256, status, content_type) VALUES (?, ?, ?, ?, ?)",
+                (url, time.time(), digest, response.status_code, response.headers.get('Content-Type'))
+            )
+            self._db.commit()
+
+    def iter_pages(self, since: Optional[float] = None) -> Iterator[Tuple[str, float, bytes]]:
+        """Yield `(url, fetched_at, body)` for each distinct stored version of a page, oldest first"""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT url, MAX(fetched_at), sha256 FROM fetches WHERE fetched_at >= ? "
+                "GROUP BY url, sha256 ORDER BY MAX(fetched_at)",
+                (since or 0,)
+            ).fetchall()
+        for url, fetched_at, digest in rows:
+            try:
+                with gzip.open(self._blob_path(digest), 'rb') as f:
+                    yield url, fetched_at, f.read()
+            except OSError as e:
+                print(f"Skipping missing archive blob for {url}: {e}")
+
+    def print_stats(self):
+        print(f"🗃️ Page archive: {self.stats['stored']} pages stored, "
+              f"{self.stats['deduplicated']} unchanged pages deduplicated")
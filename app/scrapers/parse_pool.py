@@ -0,0 +1,52 @@
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Optional
+
+
+class ParsePool:
+    """Worker processes for the CPU-bound parse and extraction of large pages.
+
+    Scrapers hand over raw bytes and get compact candidate records back, so
+    parsing runs on every core while fetch threads keep downloading. Pages
+    smaller than `inline_below` bytes (or all pages, with one worker) are
+    parsed inline, where shipping them to a process would cost more than it
+    saves. Workers are spawned lazily on the first large page.
+    """
+
+    def __init__(self, workers: Optional[int] = None, inline_below: int = 32 * 1024):
+        self.workers = workers if workers is not None else int(os.getenv("PARSE_WORKERS", os.cpu_count() or 1))
+        self.inline_below = inline_below
+        self.stats = {'offloaded': 0, 'inline': 0}
+        self._lock = threading.Lock()
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def offload(self, content: bytes) -> bool:
+        """Whether a page of this size should be parsed in a worker"""
+        offload = self.workers > 1 and len(content) >= self.inline_below
+        with self._lock:
+            self.stats['offloaded' if offload else 'inline'] += 1
+        return offload
+
+    def run(self, fn: Callable, *args):
+        with self._lock:
+            if self._executor is None:
+                # Spawned, not forked: the parent is full of threads and held locks
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=multiprocessing.get_context('spawn')
+                )
+            executor = self._executor
+        return executor.submit(fn, *args).result()
+
+    def close(self):
+        """Shut the workers down; a later large page spawns them again"""
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+    def print_stats(self):
+        print(f"🧩 Parse pool: {self.stats['offloaded']} pages parsed in {self.workers} workers, "
+              f"{self.stats['inline']} small pages inline")
+
@@ -0,0 +1,106 @@
+import argparse
+import re
+import time
+import tracemalloc
+from typing import Dict, Optional
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+try:
+    import lxml  # noqa: F401
+    DEFAULT_PARSER = 'lxml'
+except ImportError:
+    DEFAULT_PARSER = 'html.parser'
+
+_CARD_CLASS = re.compile(r'idea|card|post|item|product')
+
+
+def _is_card(name, attrs) -> bool:
+    """Card-like containers used by IdeaBrowser and Product Hunt listings"""
+    if name == 'article':
+        return True
+    classes = (attrs or {}).get('class', '')
+    if isinstance(classes, list):
+        classes = ' '.join(classes)
+    return bool(_CARD_CLASS.search(classes))
+
+
+if hasattr(SoupStrainer, 'allow_tag_creation'):
+    # bs4 >= 4.13 calls a strainer function with the tag name only, so the
+    # attribute check has to hook into tag creation itself
+    class _CardStrainer(SoupStrainer):
+        def __init__(self):
+            super().__init__(name=_CARD_CLASS)
+
+        def allow_tag_creation(self, nsprefix, name, attrs) -> bool:
+            return _is_card(name, attrs)
+
+        def matches_tag(self, tag) -> bool:
+            return _is_card(tag.name, tag.attrs)
+
+    _CARD_STRAINER = _CardStrainer()
+else:
+    # Older releases call it with the tag name and its attributes
+    _CARD_STRAINER = SoupStrainer(_is_card)
+
+
+# Named subtrees the scrapers actually look at. Everything else (head,
+# scripts, navigation, footers) is never built into the tree.
+STRAINERS = {
+    'hn_rows': SoupStrainer('tr'),  # story rows plus their metadata rows
+    'cards': _CARD_STRAINER,
+}
+
+
+def parse_html(content: bytes, only: Optional[str] = None, parser: Optional[str] = None) -> BeautifulSoup:
+    """Parse a page with the fast parser, optionally keeping only a named subtree"""
+    parse_only = STRAINERS[only] if only else None
+    return BeautifulSoup(content, parser or DEFAULT_PARSER, parse_only=parse_only)
+
+
+def _measure(content: bytes, parser: str, only: Optional[str], repeat: int) -> Dict:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        parse_html(content, only=only, parser=parser)
+        timings.append(time.perf_counter() - started)
+
+    tracemalloc.start()
+    soup = parse_html(content, only=only, parser=parser)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del soup
+    return {'seconds': min(timings), 'peak_bytes': peak}
+
+
+def benchmark(content: bytes, only: Optional[str] = None, repeat: int = 5) -> Dict[str, Dict]:
+    """Compare the pure-Python parser with lxml, full tree and strained"""
+    results = {
+        'html.parser': _measure(content, 'html.parser', None, repeat),
+        'lxml': _measure(content, 'lxml', None, repeat),
+    }
+    if only:
+        results[f'lxml+{only}'] = _measure(content, 'lxml', only, repeat)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark HTML parsing for a saved page")
+    parser.add_argument('path', help="HTML file to parse")
+    parser.add_argument('--only', choices=sorted(STRAINERS), help="named subtree to keep")
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    with open(args.path, 'rb') as f:
+        content = f.read()
+
+    results = benchmark(content, only=args.only, repeat=args.repeat)
+    baseline = results['html.parser']
+    for name, result in results.items():
+        print(f"{name:>20}: {result['seconds'] * 1000:8.1f} ms "
+              f"({baseline['seconds'] / result['seconds']:.1f}x), "
+              f"peak {result['peak_bytes'] / 1024:8.0f} KiB")
+
+
+if __name__ == "__main__":
+    main()
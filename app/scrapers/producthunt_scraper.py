@@ -1,57 +1,58 @@
-import requests
-from bs4 import BeautifulSoup
-import time
-import random
-from typing import List, Dict, Optional
+from typing import Iterator, List, Dict, Optional
 from datetime import datetime
+from urllib.parse import urlparse
 import re
 
-class ProductHuntScraper:
-    def __init__(self):
-        self.base_url = "https://www.producthunt.com"
-        self.headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        }
+from app.scrapers.fetcher import AsyncFetcher
+from app.scrapers.frontier import SeenFrontier
+from app.scrapers.listing_parser import ListingParser
+from app.scrapers.parse_pool import ParsePool
+from app.scrapers.parsing import parse_html
+
+class ProductHuntParser(ListingParser):
+    """Extracts products from Product Hunt listing pages; fetches nothing"""
+
+    def __init__(self, frontier: Optional[SeenFrontier] = None, parse_pool: Optional[ParsePool] = None):
+        super().__init__("https://www.producthunt.com", frontier=frontier, parse_pool=parse_pool)
+
+    @classmethod
+    def for_worker(cls) -> 'ProductHuntParser':
+        return ProductHuntParser()
+
+    def parse_page(self, url: str, content: bytes, limit: Optional[int] = None) -> List[Dict]:
+        """Extract products from a listing page's raw bytes (live, in a parse worker or from `PageArchive`)"""
+        soup = parse_html(content, only='cards')
         
-    def get_today_products(self, limit: int = 50) -> List[Dict]:
-        """Get today's products from Product Hunt by crawling"""
-        ideas = []
+        # Look for product containers
+        product_containers = soup.find_all(['div', 'article'], class_=re.compile(r'product|item|card|post'))
         
-        try:
-            # Get today's products page
-            response = requests.get(f"{self.base_url}/today", headers=self.headers, timeout=10)
-            response.raise_for_status()
-            
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            # Look for product containers
-            product_containers = soup.find_all(['div', 'article'], class_=re.compile(r'product|item|card|post'))
-            
-            if not product_containers:
-                # Fallback: look for any divs with product-related content
-                product_containers = soup.find_all('div', string=re.compile(r'product|app|tool|saas', re.I))
-            
-            for container in product_containers[:limit]:
-                try:
-                    idea = self._extract_idea_from_container(container)
-                    if idea and self._is_startup_related(idea):
-                        ideas.append(idea)
-                        
-                    # Rate limiting
-                    time.sleep(random.uniform(0.5, 1.0))
-                    
-                except Exception as e:
-                    print(f"Error extracting idea from container: {e}")
-                    continue
-                    
-        except Exception as e:
-            print(f"Error scraping Product Hunt: {e}")
+        if not product_containers:
+            # Fallback: look for any divs with product-related content; the
+            # strained tree holds only cards, so this needs the whole page
+            soup = parse_html(content)
+            product_containers = soup.find_all('div', string=re.compile(r'product|app|tool|saas', re.I))
         
+        ideas = []
+        for container in product_containers[:limit]:
+            idea = self._extract_idea_from_container(container)
+            if idea and self._is_startup_related(idea):
+                ideas.append(idea)
         return ideas
     
     def _extract_idea_from_container(self, container) -> Optional[Dict]:
         """Extract idea information from a product container"""
         try:
+            # Try to find link
+            link_elem = container.find('a')
+            url = link_elem.get('href', '') if link_elem else ""
+            if url and not url.startswith('http'):
+                url = self.base_url + url
+            
+            # Products seen on earlier runs are skipped before any other work
+            item_key = f"ph:{urlparse(url).path}" if url else None
+            if self.frontier and item_key and self.frontier.is_seen(item_key):
+                return None
+            
             # Try to find title
             title_elem = container.find(['h1', 'h2', 'h3', 'h4', 'h5', 'h6'])
             title = title_elem.get_text().strip() if title_elem else ""
@@ -60,12 +61,6 @@ class ProductHuntScraper:
             description_elem = container.find(['p', 'div', 'span'], class_=re.compile(r'description|tagline|summary'))
             description = description_elem.get_text().strip() if description_elem else ""
             
-            # Try to find link
-            link_elem = container.find('a')
-            url = link_elem.get('href', '') if link_elem else ""
-            if url and not url.startswith('http'):
-                url = self.base_url + url
-            
             # Try to find vote count
             vote_elem = container.find(['span', 'div'], class_=re.compile(r'vote|score|count'))
             vote_count = 0
@@ -92,7 +87,9 @@ class ProductHuntScraper:
                     'score': vote_count,
                     'comments_count': comment_count,
                     'created_utc': datetime.now().timestamp(),
-                    'source_type': 'producthunt'
+                    'source_type': 'producthunt',
+                    # The agent marks it seen once it has consumed the product
+                    'item_key': item_key
                 }
                 
         except Exception as e:
@@ -100,6 +97,53 @@ class ProductHuntScraper:
         
         return None
     
+    def _is_startup_related(self, idea: Dict) -> bool:
+        """Check if product is startup-related"""
+        title = idea.get('title', '').lower()
+        content = idea.get('content', '').lower()
+        
+        startup_keywords = [
+            'saas', 'app', 'tool', 'platform', 'service', 'software',
+            'business', 'productivity', 'automation', 'api', 'integration',
+            'analytics', 'marketing', 'sales', 'crm', 'project management',
+            'collaboration', 'communication', 'workflow', 'dashboard',
+            'startup', 'product', 'launch', 'beta', 'alpha'
+        ]
+        
+        # Check if title or content contains startup keywords
+        text_to_check = f"{title} {content}"
+        return any(keyword in text_to_check for keyword in startup_keywords)
+
+
+class ProductHuntScraper(ProductHuntParser):
+    def __init__(self, fetcher: Optional[AsyncFetcher] = None,
+                 requests_per_second: float = 1.0, burst: int = 2,
+                 frontier: Optional[SeenFrontier] = None,
+                 parse_pool: Optional[ParsePool] = None):
+        super().__init__(frontier=frontier, parse_pool=parse_pool)
+        self.fetcher = fetcher or AsyncFetcher()
+        # Crawl budget for this site; only outbound requests are throttled
+        self.fetcher.rate_limiter.configure(self.base_url, rate=requests_per_second, burst=burst)
+        self.headers = {
+            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+        }
+        
+    def get_today_products(self, limit: int = 50) -> List[Dict]:
+        """Get today's products from Product Hunt by crawling"""
+        return list(self.iter_today_products(limit))
+    
+    def iter_today_products(self, limit: int = 50) -> Iterator[Dict]:
+        """Yield today's products as soon as the page is parsed"""
+        try:
+            # Get today's products page
+            url = f"{self.base_url}/today"
+            response = self.fetcher.fetch(url, headers=self.headers, timeout=10)
+            response.raise_for_status()
+            yield from self._parse_listing(url, response.content, limit)
+                    
+        except Exception as e:
+            print(f"Error scraping Product Hunt: {e}")
+    
     def get_trending_products(self, days: int = 7, limit: int = 30) -> List[Dict]:
         """Get trending products from Product Hunt"""
         ideas = []
@@ -111,21 +155,15 @@ class ProductHuntScraper:
                 f"{self.base_url}/popular",
                 f"{self.base_url}/top"
             ]
+            responses = self.fetcher.fetch_many(trending_urls, headers=self.headers, timeout=10)
             
             for url in trending_urls:
                 try:
-                    response = requests.get(url, headers=self.headers, timeout=10)
+                    response = responses[url]
+                    if response is None:
+                        continue
                     response.raise_for_status()
-                    
-                    soup = BeautifulSoup(response.content, 'html.parser')
-                    containers = soup.find_all(['div', 'article'], class_=re.compile(r'product|item|card|post'))
-                    
-                    for container in containers[:limit//len(trending_urls)]:
-                        idea = self._extract_idea_from_container(container)
-                        if idea and self._is_startup_related(idea):
-                            ideas.append(idea)
-                    
-                    time.sleep(random.uniform(1, 2))  # Be respectful
+                    ideas.extend(self._parse_listing(url, response.content, limit//len(trending_urls)))
                     
                 except Exception as e:
                     print(f"Error scraping trending URL {url}: {e}")
@@ -136,30 +174,10 @@ class ProductHuntScraper:
         
         return ideas
     
-    def _is_startup_related(self, idea: Dict) -> bool:
-        """Check if product is startup-related"""
-        title = idea.get('title', '').lower()
-        content = idea.get('content', '').lower()
-        
-        startup_keywords = [
-            'saas', 'app', 'tool', 'platform', 'service', 'software',
-            'business', 'productivity', 'automation', 'api', 'integration',
-            'analytics', 'marketing', 'sales', 'crm', 'project management',
-            'collaboration', 'communication', 'workflow', 'dashboard',
-            'startup', 'product', 'launch', 'beta', 'alpha'
-        ]
-        
-        # Check if title or content contains startup keywords
-        text_to_check = f"{title} {content}"
-        return any(keyword in text_to_check for keyword in startup_keywords)
-    
     def get_product_details(self, url: str) -> Optional[Dict]:
         """Get detailed information about a specific product"""
         try:
-            response = requests.get(url, headers=self.headers, timeout=10)
-            response.raise_for_status()
-            
-            soup = BeautifulSoup(response.content, 'html.parser')
+            soup = self.fetcher.fetch_soup(url, headers=self.headers, timeout=10)
             
             # Extract title
             title_elem = soup.find(['h1', 'h2', 'h3', 'title'])
@@ -199,10 +217,10 @@ class ProductHuntScraper:
         try:
             # Try to find search functionality
             search_url = f"{self.base_url}/search?q={query}"
-            response = requests.get(search_url, headers=self.headers, timeout=10)
+            response = self.fetcher.fetch(search_url, headers=self.headers, timeout=10)
             
             if response.status_code == 200:
-                soup = BeautifulSoup(response.content, 'html.parser')
+                soup = parse_html(response.content, only='cards')
                 containers = soup.find_all(['div', 'article'], class_=re.compile(r'product|item|card|post'))
                 
                 for container in containers[:limit]:
@@ -213,4 +231,4 @@ class ProductHuntScraper:
         except Exception as e:
             print(f"Error searching products: {e}")
         
-        return ideas 
\ No newline at end of file
+        return ideas 
@@ -0,0 +1,73 @@
+import threading
+import time
+from typing import Dict, Optional
+from urllib.parse import urlparse
+
+
+class TokenBucket:
+    """Thread-safe token bucket: `rate` requests per second with bursts of `burst`"""
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _reserve(self) -> float:
+        """Take a token (possibly borrowing ahead) and return how long to wait for it"""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+    def _refund(self):
+        with self._lock:
+            self._tokens = min(self.burst, self._tokens + 1)
+
+    def acquire(self, timeout: Optional[float] = None) -> bool:
+        """Block until a token is available; False if that would exceed `timeout`"""
+        wait = self._reserve()
+        if timeout is not None and wait > timeout:
+            self._refund()
+            return False
+        if wait > 0:
+            time.sleep(wait)
+        return True
+
+
+class HostRateLimiter:
+    """Per-host token buckets that gate outbound requests only.
+
+    Each source registers its own crawl budget for its host; hosts without a
+    budget fall back to the default rate.
+    """
+
+    def __init__(self, default_rate: float = 2.0, default_burst: int = 2):
+        self.default_rate = default_rate
+        self.default_burst = default_burst
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _host(url: str) -> str:
+        return urlparse(url).netloc or url
+
+    def configure(self, url: str, rate: float, burst: int = 1):
+        """Set the crawl budget for the host of `url`"""
+        with self._lock:
+            self._buckets[self._host(url)] = TokenBucket(rate, burst)
+
+    def _bucket(self, url: str) -> TokenBucket:
+        host = self._host(url)
+        with self._lock:
+            bucket = self._buckets.get(host)
+            if bucket is None:
+                bucket = TokenBucket(self.default_rate, self.default_burst)
+                self._buckets[host] = bucket
+            return bucket
+
+    def acquire(self, url: str, timeout: Optional[float] = None) -> bool:
+        return self._bucket(url).acquire(timeout)
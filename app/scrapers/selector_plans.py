@@ -0,0 +1,129 @@
+import json
+import os
+import threading
+from typing import Callable, Dict, List, Optional
+
+from app.storage import cache_path
+
+
+class SelectorPlanStore:
+    """Compiled extraction plans learned from earlier runs.
+
+    For every page type a plan remembers which CSS selector matched each field
+    (container, title, content, ...). Later runs try that selector first and
+    only probe the full cascade when the known selector stops matching; the
+    winner of the probe then replaces the stale entry. A field that no
+    selector matches `absent_after` times in a row is recorded as absent
+    (empty selector) and skipped, but still probed on its first lookup of
+    each run and every `reprobe_every` lookups after that, so a field the
+    site starts rendering again is relearned.
+    A path of ':memory:' keeps plans in memory only (e.g. in parse workers).
+    """
+
+    def __init__(self, path: Optional[str] = None, absent_after: int = 5, reprobe_every: int = 10):
+        self.path = path or cache_path('selector_plans.json')
+        self.absent_after = absent_after
+        self.reprobe_every = reprobe_every
+        self.stats = {'plan_hits': 0, 'probes': 0, 'relearned': 0}
+        self._lock = threading.Lock()
+        self._misses: Dict[tuple, int] = {}
+        self._absent_lookups: Dict[tuple, int] = {}
+        self._dirty = False
+        self._plans: Dict[str, Dict[str, str]] = {}
+        if self.path != ':memory:' and os.path.exists(self.path):
+            try:
+                with open(self.path, 'r') as f:
+                    self._plans = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"Ignoring unreadable selector plans {self.path}: {e}")
+
+    def known(self, page_key: str, field: str) -> Optional[str]:
+        with self._lock:
+            return self._plans.get(page_key, {}).get(field)
+
+    def record(self, page_key: str, field: str, selector: str):
+        with self._lock:
+            self._misses.pop((page_key, field), None)
+            plan = self._plans.setdefault(page_key, {})
+            if plan.get(field) != selector:
+                if plan.get(field):
+                    self.stats['relearned'] += 1
+                plan[field] = selector
+                self._dirty = True
+
+    def plan(self, page_key: str) -> Dict[str, str]:
+        with self._lock:
+            return dict(self._plans.get(page_key, {}))
+
+    def load_plan(self, page_key: str, plan: Dict[str, str]):
+        """Replace a page type's plan wholesale, e.g. with the parent's copy inside a worker"""
+        with self._lock:
+            self._plans[page_key] = dict(plan)
+
+    def merge(self, page_key: str, plan: Dict[str, str], stats: Dict[str, int]):
+        """Adopt a plan and statistics learned elsewhere (a parse worker)"""
+        with self._lock:
+            for key, value in stats.items():
+                self.stats[key] = self.stats.get(key, 0) + value
+            if plan != self._plans.get(page_key, {}):
+                self._plans[page_key] = dict(plan)
+                self._dirty = True
+
+    def forget(self, page_key: str):
+        """Drop a page type's whole plan, e.g. after its layout changed"""
+        with self._lock:
+            if self._plans.pop(page_key, None) is not None:
+                self._dirty = True
+
+    def _record_miss(self, page_key: str, field: str):
+        with self._lock:
+            key = (page_key, field)
+            self._misses[key] = self._misses.get(key, 0) + 1
+            if self._misses[key] >= self.absent_after and field not in self._plans.get(page_key, {}):
+                self._plans.setdefault(page_key, {})[field] = ''
+                self._dirty = True
+
+    def _reprobe_due(self, page_key: str, field: str) -> bool:
+        with self._lock:
+            key = (page_key, field)
+            lookups = self._absent_lookups.get(key, 0)
+            self._absent_lookups[key] = lookups + 1
+            return lookups % self.reprobe_every == 0
+
+    def resolve(self, page_key: str, field: str, selectors: List[str], match: Callable[[str], object]):
+        """Return the first truthy `match(selector)`, trying the learned selector before probing"""
+        selector = self.known(page_key, field)
+        if selector == '' and not self._reprobe_due(page_key, field):
+            # Learned as absent on this page type
+            self.stats['plan_hits'] += 1
+            return None
+        if selector:
+            result = match(selector)
+            if result:
+                self.stats['plan_hits'] += 1
+                return result
+
+        self.stats['probes'] += 1
+        for candidate in selectors:
+            if candidate == selector:
+                continue
+            result = match(candidate)
+            if result:
+                self.record(page_key, field, candidate)
+                return result
+        self._record_miss(page_key, field)
+        return None
+
+    def print_stats(self):
+        print(f"🧭 Selector plans: {self.stats['plan_hits']} plan hits, {self.stats['probes']} probes, "
+              f"{self.stats['relearned']} relearned")
+
+    def save(self):
+        with self._lock:
+            if not self._dirty or self.path == ':memory:':
+                return
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump(self._plans, f, indent=2, sort_keys=True)
+            os.replace(tmp_path, self.path)
+            self._dirty = False
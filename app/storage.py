@@ -0,0 +1,12 @@
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Local directory for crawl caches and other persistent run state
+CACHE_DIR = os.getenv("IDEAOASIS_CACHE_DIR", "./.cache")
+
+def cache_path(name: str) -> str:
+    """Return the path of a file inside the cache directory, creating the directory if needed"""
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    return os.path.join(CACHE_DIR, name)
@@ -0,0 +1,147 @@
+import json
+import re
+from typing import Dict, List, Optional, Tuple
+
+from pydantic import BaseModel, Field, ValidationError
+
+OK, REPAIRED, FAILED = 'ok', 'repaired', 'failed'
+
+# Model families that accept `response_format` with a strict JSON schema
+_SCHEMA_MODELS = re.compile(r'^(gpt-4o|gpt-4\.1|gpt-5|o[1-9])')
+# Older models that only accept JSON mode
+_JSON_MODE_MODELS = re.compile(r'^(gpt-4-turbo|gpt-4-1106|gpt-4-0125|gpt-3\.5-turbo)')
+
+_FENCE = re.compile(r'^\s*```(?:json)?\s*|\s*```\s*$')
+
+
+class ProcessedIdea(BaseModel):
+    """What every AI answer must contain before it is published"""
+    idea_title: str = Field(min_length=1, max_length=500)
+    summary_kr: str = Field(min_length=1)
+
+
+# Hand-written rather than `model_json_schema()`: strict mode rejects length
+# constraints and requires every property plus `additionalProperties: false`
+IDEA_SCHEMA = {
+    'type': 'json_schema',
+    'json_schema': {
+        'name': 'processed_idea',
+        'strict': True,
+        'schema': {
+            'type': 'object',
+            'properties': {
+                'idea_title': {'type': 'string', 'description': '매력적이고 실행 가능한 한국어 아이디어 제목'},
+                'summary_kr': {'type': 'string', 'description': '섹션별 이모지 제목과 글머리표로 구성된 한국어 요약'}
+            },
+            'required': ['idea_title', 'summary_kr'],
+            'additionalProperties': False
+        }
+    }
+}
+
+
+def response_format_for(model: str, mode: str = 'auto', schema: Dict = IDEA_SCHEMA) -> Optional[Dict]:
+    """`response_format` for a model: 'json_schema', 'json_object', 'off', or 'auto' to pick by model name"""
+    if mode == 'auto':
+        if _SCHEMA_MODELS.match(model):
+            mode = 'json_schema'
+        elif _JSON_MODE_MODELS.match(model):
+            mode = 'json_object'
+        else:
+            mode = 'off'
+    if mode == 'json_schema':
+        return schema
+    if mode == 'json_object':
+        return {'type': 'json_object'}
+    return None
+
+
+def _strip_trailing_comma(out: List[str]):
+    end = len(out)
+    while end and out[end - 1].isspace():
+        end -= 1
+    if end and out[end - 1] == ',':
+        del out[end - 1]
+
+
+def repair_json(text: str) -> str:
+    """Fix the usual near-misses: code fences, prose around the object, raw newlines
+    inside strings, trailing commas and an object cut off mid-way"""
+    return _repair(text)[0]
+
+
+def _repair(text: str) -> Tuple[str, bool]:
+    """`repair_json`, plus whether the object was cut off and had to be closed"""
+    text = _FENCE.sub('', text.strip())
+    start = text.find('{')
+    if start < 0:
+        return text, False
+    # Scan from the first brace; the object ends at the brace that closes it,
+    # so prose after it (even with braces of its own) is dropped
+    out = []
+    closers = []
+    in_string = escaped = False
+    for char in text[start:]:
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == '\\':
+                escaped = True
+            elif char == '"':
+                in_string = False
+            elif char == '\n':
+                char = '\\n'
+            elif char == '\r':
+                char = '\\r'
+            elif char == '\t':
+                char = '\\t'
+            elif ord(char) < 0x20:
+                char = f"\\u{ord(char):04x}"
+        elif char == '"':
+            in_string = True
+        elif char in '{[':
+            closers.append('}' if char == '{' else ']')
+        elif char in '}]':
+            # Only commas outside strings are dropped, so values keep their text
+            _strip_trailing_comma(out)
+            if closers:
+                closers.pop()
+            if not closers:
+                out.append(char)
+                break
+        out.append(char)
+    truncated = in_string or bool(closers)
+    if escaped:
+        out.pop()
+    if in_string:
+        out.append('"')
+    if closers:
+        _strip_trailing_comma(out)
+    return ''.join(out) + ''.join(reversed(closers)), truncated
+
+
+def validate_idea(data) -> Optional[Dict]:
+    try:
+        return ProcessedIdea.model_validate(data).model_dump()
+    except ValidationError:
+        return None
+
+
+def parse_idea(content: str) -> Tuple[Optional[Dict], str]:
+    """Decode and validate an AI answer, repairing it locally if needed; returns `(idea, outcome)`.
+
+    An answer that was cut off (e.g. at `max_tokens`) fails even though it
+    could be closed: its last field would be published half-written.
+    """
+    try:
+        idea = validate_idea(json.loads(content))
+        if idea is not None:
+            return idea, OK
+    except ValueError:
+        pass
+    try:
+        text, truncated = _repair(content)
+        idea = None if truncated else validate_idea(json.loads(text))
+    except ValueError:
+        idea = None
+    return idea, (REPAIRED if idea is not None else FAILED)
@@ -0,0 +1,125 @@
+import json
+import re
+from typing import Dict, List, Optional
+
+from app.ai_processor import AIProcessor
+from app.prompt_budget import compact_content
+from app.structured_output import repair_json, response_format_for
+
+LLM, HEURISTIC, OFF = 'llm', 'heuristic', 'off'
+
+TRIAGE_SCHEMA = {
+    'type': 'json_schema',
+    'json_schema': {
+        'name': 'idea_ratings',
+        'strict': True,
+        'schema': {
+            'type': 'object',
+            'properties': {
+                'ratings': {
+                    'type': 'array',
+                    'items': {
+                        'type': 'object',
+                        'properties': {'id': {'type': 'integer'}, 'viability': {'type': 'number'}},
+                        'required': ['id', 'viability'],
+                        'additionalProperties': False
+                    }
+                }
+            },
+            'required': ['ratings'],
+            'additionalProperties': False
+        }
+    }
+}
+
+TRIAGE_INSTRUCTIONS = (
+    "You screen startup idea candidates for Korean founders. Rate each candidate's business "
+    "viability from 0 to 10: a concrete problem, a product someone could build and sell, a clear "
+    "customer and revenue path score high; news, opinion pieces and vague announcements score low. "
+    'Respond in JSON as {"ratings": [{"id": <candidate id>, "viability": <0-10>}]} with one entry per candidate.'
+)
+
+# Signals for the local classifier: product/business language versus news coverage
+_BUSINESS = re.compile(
+    r'\b(saas|subscription|pricing|revenue|customers?|users?|b2b|b2c|marketplace|platform|tool|app|'
+    r'automat\w*|mvp|launch\w*|beta|built|build\w*|workflow|api|freelancers?|small business\w*)\b',
+    re.IGNORECASE
+)
+_NEWS = re.compile(
+    r'\b(acquires?|acquisition|lawsuit|sues|ipo|layoffs?|raises|funding round|election|obituary|'
+    r'dies|dead at|breach|fined|ceo steps down|quarterly|earnings|opinion)\b',
+    re.IGNORECASE
+)
+
+
+class IdeaTriage:
+    """Cheap first stage that rates the top candidates before the full translation.
+
+    In `llm` mode the top `top_n` candidates go to a fast, cheap `model` in a
+    single request that returns a viability rating per candidate; if that call
+    fails, or in `heuristic` mode, a local keyword classifier rates them
+    instead. The rated candidates are reordered by viability (quality score
+    breaking ties), so only the winner goes on to `AIProcessor.process_idea`.
+    """
+
+    def __init__(self, processor: AIProcessor, model: str = 'gpt-4o-mini', top_n: int = 5,
+                 mode: str = LLM, snippet_tokens: int = 120):
+        self.processor = processor
+        self.model = model
+        self.top_n = top_n
+        self.mode = mode
+        self.snippet_tokens = snippet_tokens
+        self.response_format = response_format_for(model, 'auto', TRIAGE_SCHEMA)
+
+    def rerank(self, ideas: List[Dict]) -> List[Dict]:
+        """Rate the first `top_n` ideas and return the list with those reordered by viability"""
+        if self.mode == OFF or len(ideas) < 2:
+            return ideas
+        top_ideas = ideas[:self.top_n]
+        ratings = self._rate_with_llm(top_ideas) if self.mode == LLM else None
+        if ratings is None:
+            ratings = [self.heuristic_viability(idea) for idea in top_ideas]
+        for idea, viability in zip(top_ideas, ratings):
+            idea['viability'] = viability
+        top_ideas = sorted(top_ideas, key=lambda x: (x['viability'], x.get('quality_score', 0)), reverse=True)
+        print(f"🧮 Triage ({self.mode}) picked: {top_ideas[0].get('title', '')[:50]}... "
+              f"(viability {top_ideas[0]['viability']:.1f})")
+        return top_ideas + ideas[self.top_n:]
+
+    def _rate_with_llm(self, ideas: List[Dict]) -> Optional[List[float]]:
+        candidates = []
+        for number, idea in enumerate(ideas, 1):
+            snippet = compact_content(idea.get('content', ''), self.snippet_tokens, self.model).text
+            candidates.append(f"[{number}] {idea.get('title', '')}\n{snippet}")
+        request = dict(
+            model=self.model,
+            messages=[
+                {"role": "system", "content": TRIAGE_INSTRUCTIONS},
+                {"role": "user", "content": "\n\n".join(candidates)}
+            ],
+            temperature=0,
+            max_tokens=40 * len(ideas) + 50
+        )
+        if self.response_format:
+            request['response_format'] = self.response_format
+        try:
+            content = self.processor.complete(request, {'stage': 'triage', 'candidates': len(ideas)})
+            ratings = {int(rating['id']): float(rating['viability'])
+                       for rating in json.loads(repair_json(content))['ratings']}
+        except Exception as e:
+            print(f"⚠️ Triage model failed ({type(e).__name__}: {e}); using the heuristic classifier")
+            return None
+        # Candidates the model skipped fall back to the local classifier
+        return [min(max(ratings[number], 0.0), 10.0) if number in ratings else self.heuristic_viability(idea)
+                for number, idea in enumerate(ideas, 1)]
+
+    @staticmethod
+    def heuristic_viability(idea: Dict) -> float:
+        """Local 0-10 viability estimate from business versus news language"""
+        text = f"{idea.get('title', '')} {idea.get('content', '')}"
+        score = 5.0
+        score += min(len(set(match.lower() for match in _BUSINESS.findall(text))), 5) * 0.8
+        score -= min(len(_NEWS.findall(text)), 3) * 1.5
+        if len(idea.get('content', '')) < 50:
+            score -= 1.5
+        return min(max(score, 0.0), 10.0)
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+IdeaOasis Batch Processing Runner
+
+This script builds several days of content from one crawl:
+1. Collects, de-duplicates and ranks candidates like the daily discovery
+2. Sends the top K candidates to OpenAI as one batch job (or to a local
+   stand-in that runs the same file protocol through the regular API)
+3. Polls until the batch finishes and stores every result in the AI result
+   cache, a JSON file and optionally the database
+
+Usage:
+    python run_batch.py --top 7 --output batch_ideas.json
+    python run_batch.py --top 7 --backend local --save
+"""
+
+import argparse
+import json
+import os
+import sys
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+# Add the app directory to Python path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'app'))
+
+def main():
+    parser = argparse.ArgumentParser(description="Process the top candidates of one crawl as a batch job")
+    parser.add_argument('--top', type=int, default=7, help="how many candidates to process (default: 7)")
+    parser.add_argument('--backend', choices=['openai', 'local'], default='openai',
+                        help="OpenAI Batch API or the local stand-in (default: openai)")
+    parser.add_argument('--poll', type=float, default=30, help="seconds between status checks (default: 30)")
+    parser.add_argument('--output', default='batch_ideas.json', help="where to write the results (JSON)")
+    parser.add_argument('--save', action='store_true', help="also save the results to the database")
+    args = parser.parse_args()
+
+    from app.ai_batch import AIBatchRunner, LocalBatchBackend, OpenAIBatchBackend
+    from app.idea_discovery_agent import IdeaDiscoveryAgent
+    from app.models import create_tables
+
+    create_tables()
+    agent = IdeaDiscoveryAgent()
+    llm = agent.ai_processor.llm
+    backend = OpenAIBatchBackend(llm) if args.backend == 'openai' else LocalBatchBackend(llm)
+    runner = AIBatchRunner(agent.ai_processor, backend, poll_interval=args.poll)
+
+    try:
+        results = agent.discover_batch(args.top, runner)
+    finally:
+        agent.close()
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, ensure_ascii=False, indent=2, default=str)
+    print(f"💾 Wrote {len(results)} ideas to {args.output}")
+
+    if args.save:
+        saved = sum(1 for result in results if agent.save_idea_to_database(result))
+        print(f"💾 Saved {saved} ideas to the database")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+IdeaOasis Record/Replay Runner
+
+This script runs the full idea discovery pipeline against recorded fixtures:
+1. `record` runs discovery live and saves every HTTP response and OpenAI
+   completion into a compressed fixture bundle
+2. `replay` runs the same pipeline offline from that bundle at full speed
+   (no network, rate limiting or OpenAI key needed) and reports its timing
+
+Both modes start from empty crawl state and an empty database in a temporary
+directory, so a replay sees exactly what the recording saw.
+
+Usage:
+    python run_replay.py record fixtures/discovery.json.gz
+    python run_replay.py replay fixtures/discovery.json.gz
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+# Add the app directory to Python path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'app'))
+
+def main():
+    parser = argparse.ArgumentParser(description="Record or replay an idea discovery run")
+    parser.add_argument('mode', choices=['record', 'replay'])
+    parser.add_argument('bundle', help="fixture bundle path (gzip JSON)")
+    parser.add_argument('--seed', type=int, help="random seed for the recording (default: random)")
+    args = parser.parse_args()
+
+    # Isolated crawl state and database; must be set before the app modules load
+    workdir = tempfile.mkdtemp(prefix='ideaoasis-replay-')
+    os.environ['IDEAOASIS_CACHE_DIR'] = os.path.join(workdir, 'cache')
+    os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(workdir, 'ideaoasis.db')}"
+    if args.mode == 'replay':
+        os.environ.setdefault('OPENAI_API_KEY', 'replay')
+
+    from app.idea_discovery_agent import IdeaDiscoveryAgent
+    from app.models import create_tables
+    from app.replay import FixtureBundle
+
+    create_tables()
+    if args.mode == 'record':
+        bundle_dir = os.path.dirname(args.bundle)
+        if bundle_dir:
+            os.makedirs(bundle_dir, exist_ok=True)
+        fixtures = FixtureBundle.record(args.bundle, args.seed if args.seed is not None else random.randrange(2 ** 32))
+    else:
+        fixtures = FixtureBundle.load(args.bundle)
+
+    print(f"📼 {args.mode.capitalize()} run (seed {fixtures.seed}, state in {workdir})")
+    print("-" * 50)
+    agent = IdeaDiscoveryAgent(fixtures=fixtures, seed=fixtures.seed)
+    started = time.monotonic()
+    try:
+        idea = agent.discover_daily_idea()
+    finally:
+        agent.close()
+    elapsed = time.monotonic() - started
+    print("-" * 50)
+
+    if args.mode == 'record':
+        fixtures.save()
+    else:
+        fixtures.print_stats()
+        if fixtures.stats['http_misses'] or fixtures.stats['llm_misses']:
+            print("⚠️ This run asked for responses the recording does not have; it diverged from the recorded run")
+    print(f"⏱️ End-to-end discovery: {elapsed:.2f}s")
+    print(f"💡 Result: {idea['idea_title'] if idea else 'no idea selected'}")
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
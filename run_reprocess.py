@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""
+IdeaOasis Archive Reprocessing Runner
+
+This script re-runs the extractors and scoring over pages already stored in
+the page archive, without touching the network:
+1. Loads every distinct archived page version from the last N days
+2. Re-extracts ideas with the current selectors (frontier disabled)
+3. Re-scores and ranks them with the current scoring rules
+
+Usage:
+    python run_reprocess.py --days 7 --top 10
+"""
+
+import argparse
+import os
+import sys
+import time
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+# Add the app directory to Python path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'app'))
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-extract and re-score ideas from archived pages")
+    parser.add_argument('--days', type=float, default=7, help="how far back to reprocess (default: 7)")
+    parser.add_argument('--top', type=int, default=10, help="how many ranked ideas to print (default: 10)")
+    args = parser.parse_args()
+
+    # No OpenAI calls are made while reprocessing
+    os.environ.setdefault('OPENAI_API_KEY', 'unused')
+    from app.idea_discovery_agent import IdeaDiscoveryAgent
+
+    agent = IdeaDiscoveryAgent()
+    try:
+        ideas = agent.reprocess_archive(since=time.time() - args.days * 24 * 3600)
+    finally:
+        agent.close()
+    for rank, idea in enumerate(ideas[:args.top], 1):
+        print(f"{rank:>3}. [{idea['quality_score']:.1f}] {idea.get('source_type', '')}: {idea.get('title', '')[:70]}")
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
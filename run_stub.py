@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+IdeaOasis OpenAI Stub Server
+
+This script runs a local server that speaks the OpenAI chat-completions
+protocol, so discovery and batch processing can be load-tested end to end
+on a machine with no network:
+1. Answers streamed and non-streamed completions with usage figures
+2. Simulates first-token latency and a token rate
+3. Injects 500s, 429s (with retry-after) and malformed answers at given rates
+4. Serves canned JSON answers from a file, or builds them from the prompt
+
+Point the app at it with:
+    OPENAI_BASE_URL=http://127.0.0.1:8100/v1 OPENAI_API_KEY=stub
+
+Usage:
+    python run_stub.py --port 8100 --latency 0.5 --tps 40 --error-rate 0.05
+    python run_stub.py --responses fixtures/canned_ideas.json
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+# Add the app directory to Python path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'app'))
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a local OpenAI-compatible stub server")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8100)
+    parser.add_argument('--latency', type=float, default=0.5, help="seconds before the first token (default: 0.5)")
+    parser.add_argument('--tps', type=float, default=40, help="completion tokens per second, 0 for instant (default: 40)")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="share of requests answered with a 500")
+    parser.add_argument('--rate-limit-rate', type=float, default=0.0, help="share of requests answered with a 429")
+    parser.add_argument('--malformed-rate', type=float, default=0.0, help="share of answers that are not valid JSON")
+    parser.add_argument('--responses', help="JSON file with a list of canned answer objects")
+    parser.add_argument('--seed', type=int, help="random seed for error injection")
+    args = parser.parse_args()
+
+    from app.openai_stub import OpenAIStubServer
+
+    responses = None
+    if args.responses:
+        with open(args.responses, 'r', encoding='utf-8') as f:
+            responses = json.load(f)
+
+    server = OpenAIStubServer(
+        host=args.host, port=args.port, latency=args.latency, tokens_per_second=args.tps,
+        error_rate=args.error_rate, rate_limit_rate=args.rate_limit_rate,
+        malformed_rate=args.malformed_rate, responses=responses, seed=args.seed
+    ).start()
+    print(f"🧪 OpenAI stub listening at {server.base_url}")
+    print("Press Ctrl+C to stop the server.")
+    try:
+        while True:
+            time.sleep(60)
+    except KeyboardInterrupt:
+        server.stop()
+        server.print_stats()
+
+if __name__ == "__main__":
+    main()